@@ -0,0 +1,131 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import List
+from playwright.async_api import async_playwright
+
+DEFAULT_MAX_BROWSERS = 2
+DEFAULT_MAX_CONTEXTS = 6
+# Chromium leaks memory over long sessions; replace a browser after this many leases
+DEFAULT_PAGES_PER_BROWSER = 40
+
+
+class _PooledBrowser:
+    def __init__(self, browser):
+        self.browser = browser
+        self.leases = 0
+        self.active = 0
+        self.retired = False
+
+
+class BrowserPool:
+    """
+    Run-scoped pool of Chromium instances.
+    Scrapers lease isolated contexts (or a single page in its own context) instead of
+    launching their own browser. Browsers are started lazily, recycled after
+    pages_per_browser leases and all closed when the pool is closed.
+    """
+
+    def __init__(self,
+                 max_browsers: int = DEFAULT_MAX_BROWSERS,
+                 max_contexts: int = DEFAULT_MAX_CONTEXTS,
+                 pages_per_browser: int = DEFAULT_PAGES_PER_BROWSER,
+                 headless: bool = True):
+        self.max_browsers = max_browsers
+        self.pages_per_browser = pages_per_browser
+        self.headless = headless
+
+        self._context_sem = asyncio.Semaphore(max_contexts)
+        self._lock = asyncio.Lock()
+        self._playwright_cm = None
+        self._playwright = None
+        self._browsers: List[_PooledBrowser] = []
+        self.launched = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def _acquire_browser(self) -> _PooledBrowser:
+        async with self._lock:
+            if self._playwright is None:
+                self._playwright_cm = async_playwright()
+                self._playwright = await self._playwright_cm.__aenter__()
+
+            live = [b for b in self._browsers if not b.retired]
+            if len(live) < self.max_browsers:
+                browser = await self._playwright.chromium.launch(headless=self.headless)
+                pooled = _PooledBrowser(browser)
+                self._browsers.append(pooled)
+                self.launched += 1
+            else:
+                # Least busy browser; the context semaphore bounds the total load
+                pooled = min(live, key=lambda b: b.active)
+
+            pooled.leases += 1
+            pooled.active += 1
+            if pooled.leases >= self.pages_per_browser:
+                # No new leases; closed once the running ones are released
+                pooled.retired = True
+            return pooled
+
+    async def _release_browser(self, pooled: _PooledBrowser):
+        async with self._lock:
+            pooled.active -= 1
+            if pooled.retired and pooled.active == 0:
+                self._browsers.remove(pooled)
+                try:
+                    await pooled.browser.close()
+                except Exception as e:
+                    print(f"[BrowserPool] Error closing browser: {e}")
+
+    @asynccontextmanager
+    async def context(self, **context_kwargs):
+        """Leases a fresh, isolated BrowserContext (own cookies/storage)."""
+        async with self._context_sem:
+            pooled = await self._acquire_browser()
+            context = None
+            try:
+                context = await pooled.browser.new_context(**context_kwargs)
+                yield context
+            finally:
+                if context is not None:
+                    try:
+                        await context.close()
+                    except Exception:
+                        pass
+                await self._release_browser(pooled)
+
+    @asynccontextmanager
+    async def page(self, **context_kwargs):
+        """Leases a single page in its own isolated context."""
+        async with self.context(**context_kwargs) as context:
+            yield await context.new_page()
+
+    async def close(self):
+        async with self._lock:
+            for pooled in self._browsers:
+                try:
+                    await pooled.browser.close()
+                except Exception as e:
+                    print(f"[BrowserPool] Error closing browser: {e}")
+            self._browsers = []
+            if self._playwright_cm is not None:
+                await self._playwright_cm.__aexit__(None, None, None)
+                self._playwright_cm = None
+                self._playwright = None
+        if self.launched:
+            print(f"[BrowserPool] Closed. {self.launched} browser(s) launched during run.")
+
+
+@asynccontextmanager
+async def standalone_context(headless: bool = True, **context_kwargs):
+    """Single-use browser context for scrapers running outside a pool (e.g. verify_bot)."""
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=headless)
+        try:
+            context = await browser.new_context(**context_kwargs)
+            yield context
+        finally:
+            await browser.close()
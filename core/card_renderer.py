@@ -0,0 +1,76 @@
+"""HTML for the dashboard's doctor cards (kept free of Streamlit so it can be benchmarked)."""
+
+# Slots shown on a collapsed card
+VISIBLE_SLOTS = 5
+# Cards per page ("Mehr laden" adds another page)
+PAGE_SIZE = 20
+
+SLOT_COLORS = {"red": "#e53e3e", "green": "#38a169", "gray": "#718096"}
+
+
+def format_slot(s):
+    bg_color = SLOT_COLORS.get(s["color"], "#718096")
+    return f"""
+<div style="display:flex; justify-content:space-between; align-items:center; background:#f7fafc; padding:8px; border-radius:6px; margin-bottom:4px; border-left:4px solid {bg_color};">
+    <div>
+        <span style="font-weight:bold; color:#2d3748;">{s['day_name']} {s['date_str']}</span>
+        {f'<span style="font-weight:800; color:{bg_color}; margin-left:8px;">{s["time_str"]}</span>' if s.get('show_time', True) else ''}
+        <span style="font-size:0.85em; color:#718096; margin-left:8px;">{s['service_name']}</span>
+    </div>
+    <a href="{s['booking_url']}" target="_blank" style="text-decoration:none; color:white; background:{bg_color}; padding:4px 12px; border-radius:12px; font-size:0.8em; font-weight:bold;">Buchen</a>
+</div>"""
+
+
+def hidden_slot_count(doc, visible=VISIBLE_SLOTS):
+    return max(len(doc["slots"]) - visible, 0)
+
+
+def render_card(doc, expanded=False, visible=VISIBLE_SLOTS):
+    """
+    One result card. Collapsed cards only contain the first `visible` slots; the
+    remaining slots are rendered when the card is expanded (a rerun in the dashboard).
+    """
+    dist_text = ""
+    if "distance" in doc and doc["distance"] < 1000:
+        dist_text = f"📍 {doc['distance']:.1f} km"
+
+    badges = " ".join([f"<span class='badge' style='background:#e2e8f0; color:#4a5568; padding:2px 6px; border-radius:4px; font-size:0.8em; margin-right:4px;'>{i}</span>" for i in doc["insurance"][:3]])
+
+    shown_slots = doc["slots"] if expanded else doc["slots"][:visible]
+    slots_html = "".join([format_slot(s) for s in shown_slots])
+
+    return f"""
+<div class="result-card">
+    <div style="display:flex; justify-content:space-between; align-items:start; margin-bottom:12px;">
+        <div>
+            <div class="card-doctor">{doc['name']}</div>
+            <div class="card-meta">{doc['speciality']} • {doc['address']}</div>
+            <div class="card-meta" style="margin-top:4px;">{dist_text}</div>
+            <div style="margin-top:8px;">{badges}</div>
+        </div>
+    </div>
+    <div>
+        {slots_html}
+    </div>
+</div>
+"""
+
+
+def render_card_legacy(doc, visible=VISIBLE_SLOTS):
+    """Previous card layout: every hidden slot inlined in a <details> block (benchmark reference)."""
+    html = render_card(doc, expanded=False, visible=visible)
+    hidden_slots = doc["slots"][visible:]
+    if not hidden_slots:
+        return html
+    hidden_html = "".join([format_slot(s) for s in hidden_slots])
+    details = f"""
+<details style="margin-top:8px; cursor:pointer;">
+    <summary style="text-align:center; font-size:14px; color:#3182ce; font-weight:600; list-style:none; padding:8px; background:#ebf8ff; border-radius:6px;">
+        + {len(hidden_slots)} weitere Termine anzeigen
+    </summary>
+    <div style="margin-top:8px;">
+        {hidden_html}
+    </div>
+</details>"""
+    closing = "    </div>\n</div>\n"
+    return html[:-len(closing)] + details + "\n" + closing
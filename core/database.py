@@ -1,11 +1,98 @@
 import json
 import os
-from typing import List, Dict
+import tempfile
+from contextlib import contextmanager
+from typing import Iterable, List, Dict, Optional
 from .models import Doctor
+from .slot_codec import SLOT_FORMAT_ISO, SLOT_FORMAT_MINUTES
+
+
+@contextmanager
+def atomic_write(path: str, mode: str = 'w', fsync: bool = False):
+    """
+    Opens a temp file in the target's directory; when the block exits cleanly it is
+    made world-readable and renamed over `path`, so readers never see a half-written
+    file (open handles/mmaps of the old file stay valid). On error the temp file is removed.
+    """
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, mode, encoding=None if 'b' in mode else 'utf-8') as f:
+            yield f
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def serialize_doctor(doctor: Doctor, slot_format: str = SLOT_FORMAT_ISO) -> dict:
+    """Doctor -> stored dict, with slots as ISO strings or epoch minutes."""
+    doc_dict = doctor.model_dump()
+    if slot_format == SLOT_FORMAT_MINUTES:
+        doc_dict["slots"] = doctor.slot_minutes()
+    return doc_dict
+
+
+class DBBatch:
+    """
+    Collects upserts and stale-doctor removal in memory and writes them with one
+    atomic file replace on commit(). Optionally checkpoints every N upserts so a
+    crash mid-run keeps what was scraped so far.
+    """
+
+    def __init__(self, manager: "DBManager", checkpoint_every: int = 0):
+        self.manager = manager
+        self.data = manager.load_data()
+        self.checkpoint_every = checkpoint_every
+        self.active_ids: Optional[set] = None
+        self.upserted = 0
+        # Ids written in this batch always count as active (e.g. Perfect Smile
+        # generates one id per location/service that is not in the registry)
+        self.upserted_ids = set()
+        self._pending = 0
+
+    def upsert(self, doctor: Doctor):
+        # Overwrite the doctor entry to ensure we don't keep stale slots
+        self.data[doctor.id] = self.manager.serialize(doctor)
+        self.upserted_ids.add(doctor.id)
+        self.upserted += 1
+        self._pending += 1
+        print(f"[DB] Saved/Updated doctor: {doctor.name} ({len(doctor.slots)} slots)")
+        if self.checkpoint_every and self._pending >= self.checkpoint_every:
+            self.commit()
+
+    def remove_stale(self, active_ids: Iterable[str]):
+        """Marks every doctor not in active_ids for removal (applied on each commit)."""
+        self.active_ids = set(active_ids)
+
+    def _reconcile(self):
+        if self.active_ids is None:
+            return
+        stale = [k for k in self.data if k not in self.active_ids and k not in self.upserted_ids]
+        for k in stale:
+            del self.data[k]
+            print(f"[DB] Removed stale doctor: {k}")
+
+    def commit(self):
+        self._reconcile()
+        self.manager._write_atomic(self.data)
+        self._pending = 0
+
 
 class DBManager:
-    def __init__(self, data_dir: str = "data"):
+    def __init__(self, data_dir: str = "data", slot_format: Optional[str] = None):
+        """
+        :param slot_format: "iso" (default) keeps the scrapers' ISO strings, "minutes" stores
+            slots normalized to sorted epoch minutes (smaller, no re-parsing by readers).
+            Defaults to the SLOT_FORMAT environment variable.
+        """
         self.data_dir = data_dir
+        self.slot_format = (slot_format or os.environ.get("SLOT_FORMAT", SLOT_FORMAT_ISO)).lower()
         self.file_path = os.path.join(self.data_dir, "appointments.json")
         self._ensure_data_dir()
 
@@ -22,38 +109,66 @@ class DBManager:
         except json.JSONDecodeError:
             return {}
 
-    def save_doctor(self, doctor: Doctor):
-        data = self.load_data()
-        
-        # Convert Pydantic model to dict
-        doc_dict = doctor.model_dump()
-        
-        # Check if doctor exists to merge slots logic if needed
-        # For now, we overwrite/update the doctor entry
-        # In a real scenario, we might want to merge slots intelligently
-        
-        # Overwrite the doctor entry to ensure we don't keep stale slots
-        # and respect the limit set in main.py
-        data[doctor.id] = doc_dict
+    def serialize(self, doctor: Doctor) -> dict:
+        return serialize_doctor(doctor, self.slot_format)
+
+    def _write_atomic(self, data: Dict[str, dict]):
+        """
+        Writes to a temp file in the same directory and renames it over the target,
+        so readers (dashboard.load_data) never see a half-written file.
+        """
+        with atomic_write(self.file_path, fsync=True) as f:
+            if self.slot_format == SLOT_FORMAT_MINUTES:
+                # Compact: one int per line would undo most of the size win
+                json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+            else:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+
+    @contextmanager
+    def batch(self, checkpoint_every: int = 0):
+        """
+        Bulk API: `with db.batch() as b: b.remove_stale(ids); b.upsert(doc) ...`
+        Commits once when the block exits; on error the upserts collected so far
+        are still written, so a crashed run keeps its partial results.
+        """
+        batch = DBBatch(self, checkpoint_every=checkpoint_every)
+        try:
+            yield batch
+        finally:
+            batch.commit()
 
-        with open(self.file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        
-        print(f"[DB] Saved/Updated doctor: {doctor.name} ({len(doc_dict['slots'])} slots)")
+    def save_doctor(self, doctor: Doctor):
+        with self.batch() as batch:
+            batch.upsert(doctor)
 
     def remove_stale_doctors(self, active_ids: List[str]):
         """Removes doctors from the DB that are not in the active_ids list."""
         data = self.load_data()
-        
+        active = set(active_ids)
+
         # Find keys to remove
-        keys_to_remove = [k for k in data.keys() if k not in active_ids]
-        
+        keys_to_remove = [k for k in data.keys() if k not in active]
+
         if not keys_to_remove:
             return
-            
+
         for k in keys_to_remove:
             del data[k]
             print(f"[DB] Removed stale doctor: {k}")
-            
-        with open(self.file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+
+        self._write_atomic(data)
+
+
+def create_db_manager(backend: Optional[str] = None, data_dir: str = "data", slot_format: Optional[str] = None):
+    """
+    Returns the configured storage backend.
+    backend: "json" (default, data/appointments.json) or "sqlite" (data/appointments.sqlite).
+    Defaults to the DB_BACKEND environment variable.
+    """
+    backend = (backend or os.environ.get("DB_BACKEND", "json")).lower()
+    if backend == "sqlite":
+        from .sqlite_store import SQLiteDBManager
+        return SQLiteDBManager(data_dir, slot_format=slot_format)
+    if backend != "json":
+        raise ValueError(f"Unknown DB backend: {backend}")
+    return DBManager(data_dir, slot_format=slot_format)
@@ -0,0 +1,81 @@
+from functools import reduce
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+from .read_model import extract_city
+
+PUBLIC_INSURANCES = {"ÖGK", "BVAEB", "SVS", "SVS-GW", "SVS-LW", "KFA", "Alle Kassen"}
+PRIVATE_INSURANCES = {"Wahlarzt", "Privat"}
+
+# Insurance classes, as offered in the dashboard's "Versicherung" select
+INSURANCE_KASSE = "kasse"
+INSURANCE_PRIVATE = "wahlarzt"
+INSURANCE_MODES = {
+    "Alle Kassen": None,
+    "Nur Kasse (ÖGK etc.)": INSURANCE_KASSE,
+    "Wahlarzt/Privat": INSURANCE_PRIVATE,
+}
+
+
+def split_specialities(value) -> List[str]:
+    if isinstance(value, list):
+        return [s.strip() for s in value if s and s.strip()]
+    return [s.strip() for s in str(value or "").split(",") if s.strip()]
+
+
+def _postings(mapping: Dict[str, List[int]]) -> Dict[str, np.ndarray]:
+    # Positions are appended in ascending order, so the arrays are already sorted
+    return {key: np.asarray(ids, dtype=np.int32) for key, ids in mapping.items()}
+
+
+class FacetIndex:
+    """
+    Inverted indexes over the consolidated doctor list: speciality, insurance class and
+    city -> sorted arrays of list positions. Built once per data version; filters are
+    unions within a facet and intersections across facets.
+    """
+
+    def __init__(self, doctors: List[dict]):
+        self.size = len(doctors)
+        by_speciality: Dict[str, List[int]] = {}
+        by_insurance: Dict[str, List[int]] = {INSURANCE_KASSE: [], INSURANCE_PRIVATE: []}
+        by_city: Dict[str, List[int]] = {}
+
+        for pos, doc in enumerate(doctors):
+            for spec in dict.fromkeys(split_specialities(doc.get("speciality"))):
+                by_speciality.setdefault(spec, []).append(pos)
+            insurances = set(doc.get("insurance") or [])
+            if insurances & PUBLIC_INSURANCES:
+                by_insurance[INSURANCE_KASSE].append(pos)
+            if insurances & PRIVATE_INSURANCES:
+                by_insurance[INSURANCE_PRIVATE].append(pos)
+            by_city.setdefault(extract_city(doc.get("address")), []).append(pos)
+
+        self.by_speciality = _postings(by_speciality)
+        self.by_insurance = _postings(by_insurance)
+        self.by_city = _postings(by_city)
+        self.specialities = sorted(self.by_speciality)
+        self.cities = sorted(self.by_city)
+
+    def _union(self, postings: Dict[str, np.ndarray], keys: Iterable[str]) -> np.ndarray:
+        arrays = [postings[k] for k in keys if k in postings]
+        if not arrays:
+            return np.empty(0, dtype=np.int32)
+        return reduce(np.union1d, arrays) if len(arrays) > 1 else arrays[0]
+
+    def match(self,
+              specialities: Optional[List[str]] = None,
+              insurance_class: Optional[str] = None,
+              cities: Optional[List[str]] = None) -> np.ndarray:
+        """Sorted positions of doctors matching all given filters (None/empty = no filter)."""
+        selections = []
+        if specialities:
+            selections.append(self._union(self.by_speciality, specialities))
+        if insurance_class:
+            selections.append(self.by_insurance.get(insurance_class, np.empty(0, dtype=np.int32)))
+        if cities:
+            selections.append(self._union(self.by_city, cities))
+        if not selections:
+            return np.arange(self.size, dtype=np.int32)
+        # Smallest first keeps the intersections cheap
+        selections.sort(key=len)
+        return reduce(lambda a, b: np.intersect1d(a, b, assume_unique=True), selections)
@@ -1,5 +1,93 @@
-
 import math
+import numpy as np
+
+EARTH_RADIUS_KM = 6371
+# Grid cell size of the spatial index (~11 km north-south)
+GRID_CELL_DEG = 0.1
+
+
+def haversine_np(lat, lon, lats, lons):
+    """Distances in km from one origin to arrays of points. NaN coordinates -> inf."""
+    lat1, lon1 = np.radians(lat), np.radians(lon)
+    lat2, lon2 = np.radians(lats), np.radians(lons)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    dist = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+    return np.where(np.isnan(dist), np.inf, dist)
+
+
+class SpatialIndex:
+    """
+    Uniform lat/lon grid over doctor coordinates. Positions refer to the list the
+    index was built from; doctors without coordinates are never returned.
+    """
+
+    def __init__(self, lats, lons, cell_deg=GRID_CELL_DEG):
+        self.lats = np.asarray(lats, dtype=np.float64)
+        self.lons = np.asarray(lons, dtype=np.float64)
+        self.cell_deg = cell_deg
+        self.size = len(self.lats)
+
+        valid = np.flatnonzero(~np.isnan(self.lats) & ~np.isnan(self.lons))
+        rows = np.floor(self.lats[valid] / cell_deg).astype(np.int64)
+        cols = np.floor(self.lons[valid] / cell_deg).astype(np.int64)
+        self.cells = {}
+        if len(valid):
+            # Group positions by cell with one sort instead of a Python loop per doctor
+            order = np.lexsort((cols, rows))
+            keys = np.stack((rows[order], cols[order]), axis=1)
+            starts = np.flatnonzero(np.any(np.diff(keys, axis=0) != 0, axis=1)) + 1
+            for chunk, key in zip(np.split(valid[order], starts), keys[np.r_[0, starts]]):
+                self.cells[(int(key[0]), int(key[1]))] = chunk
+
+    @classmethod
+    def from_doctors(cls, doctors, cell_deg=GRID_CELL_DEG):
+        lats = [d.get("latitude") if d.get("latitude") is not None else np.nan for d in doctors]
+        lons = [d.get("longitude") if d.get("longitude") is not None else np.nan for d in doctors]
+        return cls(lats, lons, cell_deg)
+
+    def distances_from(self, lat, lon):
+        """Distance in km from the origin to every indexed position (inf if no coordinates)."""
+        return haversine_np(lat, lon, self.lats, self.lons)
+
+    def _candidates(self, lat, lon, radius_km):
+        # Degrees of latitude are ~111 km; longitude shrinks with cos(lat)
+        dlat = radius_km / 111.0
+        dlon = radius_km / (111.0 * max(math.cos(math.radians(lat)), 0.01))
+        r0, r1 = math.floor((lat - dlat) / self.cell_deg), math.floor((lat + dlat) / self.cell_deg)
+        c0, c1 = math.floor((lon - dlon) / self.cell_deg), math.floor((lon + dlon) / self.cell_deg)
+        chunks = [
+            self.cells[(r, c)]
+            for r in range(r0, r1 + 1)
+            for c in range(c0, c1 + 1)
+            if (r, c) in self.cells
+        ]
+        return np.concatenate(chunks) if chunks else np.empty(0, dtype=np.int64)
+
+    def within_radius(self, lat, lon, radius_km):
+        """(positions, distances) of all points within radius_km, nearest first."""
+        candidates = self._candidates(lat, lon, radius_km)
+        dist = haversine_np(lat, lon, self.lats[candidates], self.lons[candidates])
+        mask = dist <= radius_km
+        candidates, dist = candidates[mask], dist[mask]
+        order = np.argsort(dist, kind="stable")
+        return candidates[order], dist[order]
+
+    def nearest(self, lat, lon, k):
+        """(positions, distances) of the k nearest points."""
+        total = sum(len(c) for c in self.cells.values())
+        k = min(k, total)
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        # Grow the search radius until it holds k points; everything within the
+        # radius is then exact because cells outside are farther away.
+        radius = self.cell_deg * 111.0
+        max_radius = EARTH_RADIUS_KM * math.pi
+        while True:
+            positions, dist = self.within_radius(lat, lon, radius)
+            if len(positions) >= k or radius >= max_radius:
+                return positions[:k], dist[:k]
+            radius *= 2
+
 
 class FilterService:
     def haversine_distance(self, lat1, lon1, lat2, lon2):
@@ -20,3 +108,11 @@ class FilterService:
             return c * r
         except (TypeError, ValueError):
             return float('inf')
+
+    def distances(self, lat, lon, lats, lons):
+        """Batch version of haversine_distance: one origin to arrays of coordinates."""
+        return haversine_np(lat, lon, np.asarray(lats, dtype=np.float64), np.asarray(lons, dtype=np.float64))
+
+    def build_index(self, doctors, cell_deg=GRID_CELL_DEG):
+        """Spatial index over doctor dicts with 'latitude'/'longitude' for radius and kNN queries."""
+        return SpatialIndex.from_doctors(doctors, cell_deg)
@@ -1,41 +1,211 @@
-
-import requests
+import csv
+import json
+import os
+import re
+import threading
 import time
+from collections import OrderedDict
+import requests
+from .database import atomic_write
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GAZETTEER_PATH = os.path.join(ROOT_DIR, "config", "at_plz_centroids.csv")
+CACHE_PATH = os.path.join(ROOT_DIR, "data", "geocode_cache.json")
+
+CACHE_TTL_SECONDS = 90 * 24 * 3600
+# Failed lookups are retried sooner (Nominatim may just have been down)
+NEGATIVE_TTL_SECONDS = 24 * 3600
+CACHE_MAX_ENTRIES = 5000
+
+# Nominatim usage policy: max 1 request per second
+NOMINATIM_MIN_INTERVAL = 1.0
+
+PLZ_RE = re.compile(r"\b(\d{4})\b")
+
+
+def _normalize(query):
+    # "St. Pölten" and "Sankt Pölten" are the same place (the PLZ list spells out "Sankt")
+    words = str(query).lower().split()
+    return " ".join("sankt" if w in ("st.", "st") else w for w in words)
+
+
+class GeocodeCache:
+    """
+    Persistent query -> (lat, lon) cache with TTL and LRU eviction.
+    Stored as JSON: {query: [lat, lon, timestamp]} (lat/lon null for misses).
+    """
+
+    def __init__(self, path=CACHE_PATH, ttl=CACHE_TTL_SECONDS, negative_ttl=NEGATIVE_TTL_SECONDS,
+                 max_entries=CACHE_MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._load()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            # Oldest first, so LRU order survives a restart
+            for key, entry in sorted(data.items(), key=lambda kv: kv[1][2]):
+                self._entries[key] = entry
+        except (json.JSONDecodeError, OSError, IndexError, TypeError) as e:
+            print(f"[GeocodeCache] Ignoring unreadable cache {self.path}: {e}")
+
+    def get(self, query):
+        """Returns (hit, coords). coords is None for a cached miss."""
+        key = _normalize(query)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            lat, lon, ts = entry
+            ttl = self.ttl if lat is not None else self.negative_ttl
+            if time.time() - ts > ttl:
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+            return True, ((lat, lon) if lat is not None else None)
+
+    def set(self, query, coords):
+        key = _normalize(query)
+        lat, lon = coords if coords else (None, None)
+        with self._lock:
+            self._entries[key] = [lat, lon, time.time()]
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            data = dict(self._entries)
+        directory = os.path.dirname(self.path)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            with atomic_write(self.path) as f:
+                json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        except OSError as e:
+            # Read-only deployments still work, just without persistence
+            print(f"[GeocodeCache] Could not save cache: {e}")
+
+
+class PostcodeGazetteer:
+    """Offline Austrian PLZ/Ort table (config/at_plz_centroids.csv, see scripts/build_plz_table.py)."""
+
+    def __init__(self, path=GAZETTEER_PATH):
+        self.by_plz = {}
+        self.by_name = {}
+        if not os.path.exists(path):
+            return
+        with open(path, 'r', encoding='utf-8') as f:
+            for row in csv.DictReader(f, delimiter=";"):
+                coords = (float(row["lat"]), float(row["lon"]))
+                # First row of a PLZ and first PLZ of a town win (e.g. "Graz" -> 8010)
+                self.by_plz.setdefault(row["plz"], coords)
+                self.by_name.setdefault(_normalize(row["ort"]), coords)
+
+    def lookup(self, query):
+        """Resolves "9020", "9020 Klagenfurt" or "Klagenfurt"; None for anything else."""
+        text = _normalize(query)
+        match = PLZ_RE.search(text)
+        if match and match.group(1) in self.by_plz:
+            return self.by_plz[match.group(1)]
+        return self.by_name.get(text)
+
 
 class GeocodingService:
-    def __init__(self):
+    def __init__(self, cache=None, gazetteer=None):
         self.base_url = "https://nominatim.openstreetmap.org/search"
         self.headers = {
             'User-Agent': 'MedicalTerminFinder/3.0'
         }
+        self.cache = cache if cache is not None else GeocodeCache()
+        self.gazetteer = gazetteer if gazetteer is not None else PostcodeGazetteer()
+        self._rate_lock = threading.Lock()
+        self._last_request = 0.0
+
+    @staticmethod
+    def _is_place_query(address):
+        # "9020", "9020 Klagenfurt", "Graz" - no street part
+        return "," not in address and not any(ch.isdigit() for ch in PLZ_RE.sub("", address))
 
-    def geocode_address(self, address):
+    def geocode_address(self, address, fallback_to_postcode=True, persist=True):
         """
         Geocodes an address string to (lat, lon).
-        Returns None if not found or error.
+        Order: offline PLZ/Ort table (for plain place queries), persistent cache,
+        then rate-limited Nominatim. Street addresses Nominatim can't resolve fall back
+        to their PLZ centroid. Returns None if not found or error.
         """
         if not address:
             return None
-            
+
+        if self._is_place_query(address):
+            coords = self.gazetteer.lookup(address)
+            if coords:
+                return coords
+
+        hit, coords = self.cache.get(address)
+        if hit:
+            return coords
+
+        coords = self._query_nominatim(address)
+        if coords is None and fallback_to_postcode:
+            coords = self.gazetteer.lookup(address)
+        self.cache.set(address, coords)
+        if persist:
+            self.cache.save()
+        return coords
+
+    def geocode_batch(self, addresses):
+        """
+        Geocodes many addresses, each distinct address once (cache first, Nominatim
+        rate-limited to 1 req/s). Saves the cache once at the end.
+        Returns {address: (lat, lon) or None}.
+        """
+        unique = list(dict.fromkeys(a for a in addresses if a))
+        results = {}
+        misses = 0
+        for address in unique:
+            hit, coords = self.cache.get(address)
+            if not hit:
+                misses += 1
+                coords = self.geocode_address(address, persist=False)
+            results[address] = coords
+        self.cache.save()
+        resolved = sum(1 for c in results.values() if c)
+        print(f"[Geocoder] {len(unique)} distinct addresses, {misses} not cached, {resolved} resolved.")
+        return results
+
+    def _query_nominatim(self, address):
         params = {
             'q': address,
             'format': 'json',
             'limit': 1,
             'countrycodes': 'at' # Restrict to Austria
         }
-        
+
         try:
-            # Respect Nominatim usage policy (max 1 req/sec)
-            # Since this is a client, we don't expect high load, but good to be safe if called in loop
-            # However, dashboard calls it once per search usually.
+            # Respect Nominatim usage policy (max 1 req/sec), also across dashboard sessions
+            with self._rate_lock:
+                wait = NOMINATIM_MIN_INTERVAL - (time.monotonic() - self._last_request)
+                if wait > 0:
+                    time.sleep(wait)
+                self._last_request = time.monotonic()
             response = requests.get(self.base_url, params=params, headers=self.headers, timeout=5)
             response.raise_for_status()
             data = response.json()
-            
+
             if data:
                 return (float(data[0]['lat']), float(data[0]['lon']))
             return None
-            
+
         except Exception as e:
             print(f"Geocoding error for {address}: {e}")
             return None
@@ -0,0 +1,62 @@
+from contextlib import asynccontextmanager
+import aiohttp
+
+DEFAULT_TOTAL_TIMEOUT = 30
+DEFAULT_CONNECT_TIMEOUT = 10
+DEFAULT_MAX_CONNECTIONS = 50
+DEFAULT_MAX_PER_HOST = 8
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+}
+
+
+def create_http_session(total_timeout: float = DEFAULT_TOTAL_TIMEOUT,
+                        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+                        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+                        max_per_host: int = DEFAULT_MAX_PER_HOST) -> aiohttp.ClientSession:
+    """
+    Creates the run-wide aiohttp session.
+    Connections are kept alive and pooled per host; every request gets the timeouts below.
+    Must be created inside a running event loop and closed at the end of the run.
+    """
+    connector = aiohttp.TCPConnector(
+        limit=max_connections,
+        limit_per_host=max_per_host,
+        ttl_dns_cache=300
+    )
+    timeout = aiohttp.ClientTimeout(total=total_timeout, connect=connect_timeout)
+    return aiohttp.ClientSession(connector=connector, timeout=timeout, headers=DEFAULT_HEADERS)
+
+
+@asynccontextmanager
+async def standalone_session():
+    """Single-use session for scrapers running outside main() (e.g. verify_bot)."""
+    session = create_http_session()
+    try:
+        yield session
+    finally:
+        await session.close()
+
+
+@asynccontextmanager
+async def cookie_session(shared: aiohttp.ClientSession = None):
+    """
+    Session with its own cookie jar (e.g. one PHP session per scraper), reusing the
+    connection pool, timeouts and headers of the run-wide session if one is given.
+    """
+    if shared is None:
+        async with standalone_session() as session:
+            yield session
+        return
+    session = aiohttp.ClientSession(
+        connector=shared.connector,
+        connector_owner=False,
+        timeout=shared.timeout,
+        headers=shared.headers,
+        cookie_jar=aiohttp.CookieJar()
+    )
+    try:
+        yield session
+    finally:
+        await session.close()
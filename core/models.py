@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 from typing import List, Optional, Union
+from .slot_codec import encode_slots
 
 class AppointmentSlot(BaseModel):
     start_time: str # ISO 8601 string
@@ -13,3 +14,9 @@ class Doctor(BaseModel):
     slots: List[str] # List of ISO strings for simplicity in JSON
     booking_url: str = "" # for simplicity in JSON
     show_time: bool = True # Whether to show the time in the dashboard
+    latitude: Optional[float] = None # Set by the geocoding stage in main.py
+    longitude: Optional[float] = None
+
+    def slot_minutes(self) -> List[int]:
+        """Slots normalized to sorted Europe/Vienna-aware epoch minutes (see core.slot_codec)."""
+        return encode_slots(self.slots)
@@ -0,0 +1,77 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+QUERY_CACHE_MAX_ENTRIES = 256
+
+
+def file_version(path: str) -> Optional[tuple]:
+    """(mtime_ns, size) of a data file; changes whenever the scraper rewrites it."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+class QueryCache:
+    """
+    Bounded LRU cache for dashboard search results, shared by all sessions.
+    Keys are (data_version, normalized filters); entries of an older data version
+    are dropped as soon as a newer version is seen.
+    """
+
+    def __init__(self, max_entries: int = QUERY_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _switch_version(self, version):
+        if version != self._version:
+            self._entries.clear()
+            self._version = version
+
+    def get(self, version, key: Hashable):
+        """Returns (hit, value)."""
+        with self._lock:
+            self._switch_version(version)
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, self._entries[key]
+            self.misses += 1
+            return False, None
+
+    def put(self, version, key: Hashable, value):
+        with self._lock:
+            self._switch_version(version)
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, version, key: Hashable, compute):
+        hit, value = self.get(version, key)
+        if hit:
+            return value
+        # Computed outside the lock; two sessions may race on the same key, which is harmless
+        value = compute()
+        self.put(version, key, value)
+        return value
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
@@ -0,0 +1,245 @@
+import json
+import os
+import re
+from datetime import datetime
+from operator import itemgetter
+from typing import Dict, List, Optional
+from .database import atomic_write
+from .slot_codec import to_local_datetime
+
+# Dashboard-ready model written by main.py next to appointments.json
+READ_MODEL_FILE = "dashboard_model.json"
+READ_MODEL_VERSION = 1
+
+def extract_city(address):
+    if not address: return "Unbekannt"
+    try:
+        parts = address.split(",")
+        if len(parts) > 1:
+            city_part = parts[-1].strip()
+            sub_parts = city_part.split(" ", 1)
+            if len(sub_parts) > 1 and sub_parts[0].isdigit() and len(sub_parts[0]) == 4:
+                return sub_parts[1]
+            return city_part
+        return address
+    except:
+        return "Unbekannt"
+
+def normalize_speciality(raw):
+    if isinstance(raw, list):
+        return ", ".join([normalize_single_speciality(s) for s in raw])
+    return normalize_single_speciality(raw)
+
+def normalize_single_speciality(raw):
+    if not isinstance(raw, str): return str(raw)
+    s = raw.lower()
+    if "allgemeinmedizin" in s: return "Allgemeinmedizin"
+    if "kinder" in s and "jugend" in s: return "Kinderheilkunde"
+    if "frauenheilkunde" in s or "gynäkologie" in s: return "Gynäkologie & Geburtshilfe"
+    if "innere medizin" in s: return "Innere Medizin"
+    if "zahn" in s or "kiefer" in s: return "Zahnmedizin / Kieferorthopädie"
+    if "orthopädie" in s: return "Orthopädie"
+    if "hno" in s or "hals" in s: return "HNO"
+    if "kardiologie" in s: return "Innere Medizin (Kardiologie)"
+    return raw
+
+def classify_service(name):
+    """Classifies a service name into Akut, Vorsorge, or Sonstiges (Currently all gray)."""
+    return "Sonstiges", "gray"
+
+# "Provider Name (Service)", e.g. "Perfect Smile Klagenfurt (Beratung)"
+NAME_SERVICE_RE = re.compile(r"^(.*?)\s*\((.*?)\)$")
+
+def _resolve_group(doc):
+    """Returns (group_key, base_service_name) for one raw doctor entry."""
+    raw_name = doc.get("name", "Unknown")
+    group_key = doc.get("group_id")
+    base_service_name = "Termin"
+
+    match = NAME_SERVICE_RE.match(raw_name)
+    if match:
+        if not group_key:
+            group_key = match.group(1).strip()
+        # If the service name looks like a location or generic (e.g. just "Wolfsberg"), keep it.
+        # But usually it's "Beratung", "Schmerzen", etc.
+        base_service_name = match.group(2).strip()
+    elif " | " in raw_name:
+        # Fallback for "Name | Service" pattern
+        parts = raw_name.split(" | ")
+        if not group_key:
+            group_key = parts[0].strip()
+        if len(parts) > 1:
+            base_service_name = parts[1].strip()
+
+    if not group_key:
+        group_key = raw_name
+    return group_key, base_service_name
+
+def _parse_slots(values):
+    """
+    Parses every distinct slot value once (many doctors share the same times).
+    Returns {value: (datetime, time_str, date_str, day_name)}; unparseable values are skipped.
+    """
+    parsed = {}
+    by_datetime = {}
+    for value in values:
+        if value in parsed:
+            continue
+        try:
+            dt = to_local_datetime(value)
+        except (ValueError, TypeError):
+            dt = None
+        if dt is None:
+            continue
+        fields = by_datetime.get(dt)
+        if fields is None:
+            fields = (dt, dt.strftime("%H:%M"), dt.strftime("%d.%m.%Y"), dt.strftime("%a"))
+            by_datetime[dt] = fields
+        parsed[value] = fields
+    return parsed
+
+def consolidate_data(doctors_json):
+    """
+    Consolidates granular doctor entries (Dr. X Akut, Dr. X Checkup) into single Grouped objects.
+    Returns a list of dicts representing unique Doctors/Groups with aggregated slots.
+    Linear in the number of slots: timestamps are parsed once per distinct value and
+    duplicates are dropped via a (datetime, service) set per group.
+    """
+    # Pass 1: resolve groups and the (slot, service label) pairs of every entry
+    entries = []
+    all_values = []
+    for doc in doctors_json.values():
+        group_key, base_service_name = _resolve_group(doc)
+
+        # Collect slots from appointment_types or flat slots
+        labelled = []
+        for t in doc.get("appointment_types", []):
+            if t.get("slots"):
+                label = t.get("name", base_service_name)
+                labelled.extend((s, label) for s in t["slots"])
+        if not labelled:
+            labelled = [(s, base_service_name) for s in doc.get("slots", [])]
+
+        all_values.extend(s for s, _ in labelled)
+        entries.append((doc, group_key, labelled))
+
+    parsed = _parse_slots(all_values)
+
+    # Pass 2: aggregate
+    aggregated_doctors = {}
+    seen_by_group = {}
+    service_classes = {}
+    for doc, group_key, labelled in entries:
+        group = aggregated_doctors.get(group_key)
+        if group is None:
+            group = aggregated_doctors[group_key] = {
+                "name": group_key,
+                "speciality": normalize_speciality(doc.get("speciality", "")),
+                "address": doc.get("address", ""),
+                "insurance": doc.get("insurance", []),
+                "booking_url": doc.get("booking_url"), # Default URL
+                "latitude": doc.get("latitude"),
+                "longitude": doc.get("longitude"),
+                "slots": []
+            }
+            seen_by_group[group_key] = set()
+        seen = seen_by_group[group_key]
+        group_slots = group["slots"]
+        booking_url = doc.get("booking_url", group["booking_url"])
+        show_time = doc.get("show_time", True)
+
+        for value, s_name in labelled:
+            fields = parsed.get(value)
+            if fields is None:
+                continue
+            dt_naive = fields[0]
+
+            # Avoid duplicates (day, time, service)
+            key = (dt_naive, s_name)
+            if key in seen:
+                continue
+            seen.add(key)
+
+            if s_name not in service_classes:
+                service_classes[s_name] = classify_service(s_name)
+            category, color = service_classes[s_name]
+            group_slots.append({
+                "datetime": dt_naive,
+                "time_str": fields[1],
+                "date_str": fields[2],
+                "day_name": fields[3],
+                "service_name": s_name,
+                "category": category,
+                "color": color,
+                "booking_url": booking_url,
+                "show_time": show_time
+            })
+
+    # Convert to list and post-process
+    by_datetime = itemgetter("datetime")
+    result_doctors = []
+    for data in aggregated_doctors.values():
+        if data["slots"]:
+            # Sort slots by time (stable, like the previous implementation)
+            data["slots"].sort(key=by_datetime)
+            # Calculate next available slot
+            data["next_slot"] = data["slots"][0]["datetime"]
+            result_doctors.append(data)
+
+    # Sort doctors by earliest available slot by default (render_results will do final sort)
+    result_doctors.sort(key=itemgetter("next_slot"))
+    return result_doctors
+
+def _dump_group(group: dict) -> dict:
+    out = dict(group)
+    out["next_slot"] = group["next_slot"].isoformat()
+    out["slots"] = [dict(s, datetime=s["datetime"].isoformat()) for s in group["slots"]]
+    return out
+
+def _load_group(group: dict) -> dict:
+    group["next_slot"] = datetime.fromisoformat(group["next_slot"])
+    for s in group["slots"]:
+        s["datetime"] = datetime.fromisoformat(s["datetime"])
+    return group
+
+def build_read_model(doctors_json: Dict[str, dict], doctors: Optional[List[dict]] = None) -> dict:
+    if doctors is None:
+        doctors = consolidate_data(doctors_json)
+    return {
+        "version": READ_MODEL_VERSION,
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "doctors": [_dump_group(d) for d in doctors],
+    }
+
+def write_read_model(doctors_json: Dict[str, dict], data_dir: str = "data",
+                     doctors: Optional[List[dict]] = None) -> str:
+    """
+    Consolidates the scraped data once and writes it atomically for the dashboard.
+    Pass already consolidated groups as `doctors` to skip consolidating again.
+    """
+    path = os.path.join(data_dir, READ_MODEL_FILE)
+    model = build_read_model(doctors_json, doctors)
+    with atomic_write(path) as f:
+        json.dump(model, f, ensure_ascii=False, separators=(",", ":"))
+    print(f"[ReadModel] Wrote {len(model['doctors'])} groups to {path}")
+    return path
+
+def load_read_model(data_dir: str = "data", source_path: Optional[str] = None) -> Optional[dict]:
+    """
+    Loads the precomputed model, or None if it is missing, from another version or
+    older than source_path (appointments.json written without a model refresh).
+    """
+    path = os.path.join(data_dir, READ_MODEL_FILE)
+    if not os.path.exists(path):
+        return None
+    if source_path and os.path.exists(source_path) and os.path.getmtime(source_path) > os.path.getmtime(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            model = json.load(f)
+    except (json.JSONDecodeError, OSError):
+        return None
+    if model.get("version") != READ_MODEL_VERSION:
+        return None
+    model["doctors"] = [_load_group(d) for d in model["doctors"]]
+    return model
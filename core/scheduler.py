@@ -0,0 +1,180 @@
+import asyncio
+import time
+from typing import Dict, List, Optional
+
+# Defaults tuned for the GitHub runner: Playwright scrapers are memory hungry
+# (one Chromium each), the JSON-API scrapers are cheap but must not burst.
+DEFAULT_GLOBAL_LIMIT = 12
+
+DEFAULT_TYPE_LIMITS = {
+    "latido": 8,
+    "timesloth": 4,
+    "mobimed": 4,
+    "custom_aichinger": 2,
+    "custom_palasser": 2,
+    "medineum": 2,
+    "kutschera": 2,
+    "timify": 2,
+    "doctena": 2,
+    "custom_perfect_smile": 1,
+}
+
+DEFAULT_HOST_LIMITS = {
+    "patient.latido.at": 6,
+    "www.wisitor.at": 2,
+}
+
+# Fallback for types/hosts without an explicit entry
+DEFAULT_TYPE_LIMIT = 4
+DEFAULT_HOST_LIMIT = 4
+# Jobs listed by name in the report (longest queue wait first)
+REPORT_SLOWEST_JOBS = 10
+
+
+class ScrapeJob:
+    """One scheduled scraper run plus its timing stats."""
+
+    def __init__(self, scraper, scraper_type: str, host: Optional[str]):
+        self.scraper = scraper
+        self.scraper_type = scraper_type
+        self.host = host
+        self.queued_at = 0.0
+        self.started_at = 0.0
+        self.finished_at = 0.0
+
+    @property
+    def job_id(self) -> str:
+        """Doctor id, or institution id for scrapers that cover a whole institution."""
+        institution_id = getattr(self.scraper, "institution_id", None)
+        if institution_id is not None:
+            return f"institution {institution_id}"
+        return str(getattr(self.scraper, "doctor_id", None) or "?")
+
+    @property
+    def wait_time(self) -> float:
+        return max(0.0, self.started_at - self.queued_at)
+
+    @property
+    def run_time(self) -> float:
+        return max(0.0, self.finished_at - self.started_at)
+
+
+class ScraperScheduler:
+    """
+    Runs scraper jobs with bounded concurrency.
+    A job only starts once it holds a slot in the global cap, its scraper_type
+    limit and its host limit, so bursts against one platform are smoothed out.
+    """
+
+    def __init__(self,
+                 global_limit: int = DEFAULT_GLOBAL_LIMIT,
+                 type_limits: Optional[Dict[str, int]] = None,
+                 host_limits: Optional[Dict[str, int]] = None,
+                 default_type_limit: int = DEFAULT_TYPE_LIMIT,
+                 default_host_limit: int = DEFAULT_HOST_LIMIT):
+        self.global_limit = global_limit
+        self.type_limits = dict(DEFAULT_TYPE_LIMITS if type_limits is None else type_limits)
+        self.host_limits = dict(DEFAULT_HOST_LIMITS if host_limits is None else host_limits)
+        self.default_type_limit = default_type_limit
+        self.default_host_limit = default_host_limit
+
+        self._global_sem = None
+        self._type_sems: Dict[str, asyncio.Semaphore] = {}
+        self._host_sems: Dict[str, asyncio.Semaphore] = {}
+        self.jobs: List[ScrapeJob] = []
+
+    def _type_sem(self, scraper_type: str) -> asyncio.Semaphore:
+        if scraper_type not in self._type_sems:
+            limit = self.type_limits.get(scraper_type, self.default_type_limit)
+            self._type_sems[scraper_type] = asyncio.Semaphore(limit)
+        return self._type_sems[scraper_type]
+
+    def _host_sem(self, host: str) -> asyncio.Semaphore:
+        if host not in self._host_sems:
+            limit = self.host_limits.get(host, self.default_host_limit)
+            self._host_sems[host] = asyncio.Semaphore(limit)
+        return self._host_sems[host]
+
+    def add(self, scraper, scraper_type: str) -> ScrapeJob:
+        job = ScrapeJob(scraper, scraper_type, getattr(scraper, "host", None))
+        self.jobs.append(job)
+        return job
+
+    async def _run_job(self, job: ScrapeJob):
+        # Acquire type/host first so a slow platform doesn't hog global slots
+        async with self._type_sem(job.scraper_type):
+            host_sem = self._host_sem(job.host) if job.host else None
+            if host_sem:
+                await host_sem.acquire()
+            try:
+                async with self._global_sem:
+                    job.started_at = time.monotonic()
+                    try:
+                        return await job.scraper.scrape()
+                    finally:
+                        job.finished_at = time.monotonic()
+            finally:
+                if host_sem:
+                    host_sem.release()
+
+    def _prepare(self):
+        self._global_sem = asyncio.Semaphore(self.global_limit)
+        queued_at = time.monotonic()
+        for job in self.jobs:
+            job.queued_at = queued_at
+
+    async def run(self) -> list:
+        """
+        Runs all added jobs and returns their results in job order.
+        Exceptions are returned in place of results (like gather(return_exceptions=True)).
+        """
+        self._prepare()
+        tasks = [self._run_job(job) for job in self.jobs]
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def stream(self):
+        """
+        Runs all added jobs and yields (job, result) as soon as each one finishes,
+        so results can be persisted without waiting for the slowest scraper.
+        Exceptions are yielded in place of results.
+        """
+        self._prepare()
+
+        async def run_one(job: ScrapeJob):
+            try:
+                return job, await self._run_job(job)
+            except Exception as e:
+                return job, e
+
+        for next_done in asyncio.as_completed([run_one(job) for job in self.jobs]):
+            yield await next_done
+
+    def report(self, slowest: int = REPORT_SLOWEST_JOBS):
+        """Prints queue wait and run time per scraper type, then the `slowest` jobs by wait."""
+        if not self.jobs:
+            return
+        stats: Dict[str, List[ScrapeJob]] = {}
+        for job in self.jobs:
+            stats.setdefault(job.scraper_type, []).append(job)
+
+        print("--- Scheduler Report ---")
+        total_requests = total_saved = 0
+        for scraper_type, jobs in sorted(stats.items()):
+            waits = [j.wait_time for j in jobs]
+            runs = [j.run_time for j in jobs]
+            budgets = [j.scraper.budget for j in jobs if getattr(j.scraper, "budget", None) is not None]
+            requests = sum(b.requests for b in budgets)
+            saved = sum(b.saved for b in budgets)
+            total_requests += requests
+            total_saved += saved
+            print(f"   {scraper_type}: {len(jobs)} jobs, "
+                  f"wait avg {sum(waits) / len(waits):.1f}s / max {max(waits):.1f}s, "
+                  f"run avg {sum(runs) / len(runs):.1f}s, "
+                  f"{requests} budgeted requests, {saved} saved")
+        print(f"   Slot budget: {total_saved} requests saved ({total_requests} made)")
+
+        waited = sorted(self.jobs, key=lambda j: j.wait_time, reverse=True)[:slowest]
+        if waited:
+            print("   Longest queue waits:")
+            for job in waited:
+                print(f"      {job.job_id} ({job.scraper_type}): wait {job.wait_time:.1f}s, run {job.run_time:.1f}s")
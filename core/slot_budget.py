@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+from .slot_codec import VIENNA, to_epoch_minutes
+
+# main.py keeps at most this many slots per doctor; fetching more is wasted work
+DEFAULT_MAX_SLOTS = 50
+# How far ahead scrapers look at most (the dashboard's widest range is one year)
+DEFAULT_HORIZON_DAYS = 365
+
+
+class SlotBudget:
+    """
+    How many future slots a scraper needs and how far ahead it may look.
+    Scrapers check satisfied() before requesting another window/page/week and
+    record what they requested and what they skipped, for the run report.
+    It also records how far the scraper successfully looked (covered_until, advanced
+    via cover() only for fetches that returned parseable data, and ignored once
+    truncated), so slot history never closes slots the run did not fetch.
+    """
+
+    def __init__(self, max_slots: int = DEFAULT_MAX_SLOTS, horizon_days: int = DEFAULT_HORIZON_DAYS,
+                 now: Optional[datetime] = None):
+        self.max_slots = max_slots
+        self.horizon_days = horizon_days
+        # Naive Vienna time, like to_local_datetime() (the runner's clock is UTC)
+        self.start = now or datetime.now(VIENNA).replace(tzinfo=None)
+        self.end = self.start + timedelta(days=horizon_days)
+        # count() compares epoch minutes, so slots are never turned back into datetimes
+        self._start_minute = to_epoch_minutes(self.start.isoformat())
+        self._end_minute = to_epoch_minutes(self.end.isoformat())
+        self.requests = 0
+        self.saved = 0
+        # Advanced by cover(); None = unknown
+        self.covered_until: Optional[datetime] = None
+        # The scraper stopped before covered_until (budget met or its own cap)
+        self.truncated = False
+
+    def lookahead_days(self, max_days: Optional[int] = None) -> int:
+        """Days the scraper will look ahead: the horizon, optionally capped by its own limit."""
+        return self.horizon_days if max_days is None else min(max_days, self.horizon_days)
+
+    def horizon_end(self, max_days: Optional[int] = None) -> datetime:
+        """End of the horizon, optionally capped by a scraper's own limit."""
+        return self.start + timedelta(days=self.lookahead_days(max_days))
+
+    def reset(self):
+        """Forgets requests, savings and coverage, e.g. before retrying a scrape another way."""
+        self.requests = 0
+        self.saved = 0
+        self.covered_until = None
+        self.truncated = False
+
+    def cover(self, until: datetime):
+        """Records that every slot up to `until` (naive Vienna time) was fetched successfully."""
+        if self.covered_until is None or until > self.covered_until:
+            self.covered_until = until
+
+    @property
+    def fetched_until(self) -> Optional[datetime]:
+        """Last slot time the run is known to have looked at (None = only up to the last slot found)."""
+        return None if self.truncated else self.covered_until
+
+    def count(self, slots: Iterable) -> int:
+        """Number of slots between now and the horizon (naive Vienna time)."""
+        n = 0
+        for minute in map(to_epoch_minutes, slots):
+            if minute is not None and self._start_minute <= minute <= self._end_minute:
+                n += 1
+        return n
+
+    def satisfied(self, slots: Iterable) -> bool:
+        return self.count(slots) >= self.max_slots
+
+    def request(self, n: int = 1):
+        self.requests += n
+
+    def skip(self, n: int):
+        """Records requests not made because the budget was already met."""
+        self.truncated = True
+        if n > 0:
+            self.saved += n
@@ -0,0 +1,62 @@
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Iterable, List, Optional, Union
+from zoneinfo import ZoneInfo
+
+VIENNA = ZoneInfo("Europe/Vienna")
+
+# Storage formats for Doctor.slots in the DB backends
+SLOT_FORMAT_ISO = "iso"          # list of ISO strings as returned by the scrapers
+SLOT_FORMAT_MINUTES = "minutes"  # sorted list of epoch minutes (ints)
+
+SlotValue = Union[str, int]
+
+# Parsed ISO strings kept in memory: the same slot strings are parsed by the slot
+# budget on every window, by the DB encoder and by slot history within one run
+PARSE_CACHE_SIZE = 1 << 16
+
+
+def to_epoch_minutes(slot: SlotValue) -> Optional[int]:
+    """
+    Normalizes one slot to epoch minutes.
+    Naive ISO strings are Europe/Vienna local time, 'Z'/offset strings are converted,
+    ints are assumed to be epoch minutes already.
+    """
+    if isinstance(slot, int):
+        return slot
+    if not isinstance(slot, str):
+        return None
+    return _iso_to_epoch_minutes(slot)
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _iso_to_epoch_minutes(slot: str) -> Optional[int]:
+    try:
+        dt = datetime.fromisoformat(slot.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=VIENNA)
+    return int(dt.timestamp()) // 60
+
+
+def from_epoch_minutes(minute: int) -> datetime:
+    """Epoch minutes -> naive Europe/Vienna local datetime (what the dashboards display)."""
+    return datetime.fromtimestamp(minute * 60, tz=timezone.utc).astimezone(VIENNA).replace(tzinfo=None)
+
+
+def to_local_datetime(slot: SlotValue) -> Optional[datetime]:
+    """Any stored slot value (ISO string or epoch minutes) -> naive Vienna datetime."""
+    minute = to_epoch_minutes(slot)
+    return from_epoch_minutes(minute) if minute is not None else None
+
+
+def to_local_iso(slot: SlotValue) -> Optional[str]:
+    dt = to_local_datetime(slot)
+    return dt.isoformat() if dt is not None else None
+
+
+def encode_slots(slots: Iterable[SlotValue]) -> List[int]:
+    """Slot list -> sorted, de-duplicated epoch minutes. Unparseable entries are dropped."""
+    return sorted({m for m in map(to_epoch_minutes, slots) if m is not None})
+
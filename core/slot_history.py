@@ -0,0 +1,195 @@
+import json
+import os
+import time
+from array import array
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+from .database import atomic_write
+from .slot_codec import SlotValue, to_epoch_minutes, from_epoch_minutes
+
+# One closed interval per record: doctor index, slot start, first seen, vanished
+# (all times in epoch minutes). 16 bytes per (doctor, slot) lifetime.
+RECORD_FIELDS = 4
+RECORD_TYPECODE = "i"
+RECORD_DTYPE = np.int32
+
+
+def _minute_to_iso(minute: int) -> str:
+    return from_epoch_minutes(minute).isoformat()
+
+
+class SlotHistoryStore:
+    """
+    Append-only history of slot availability, written next to the DBManager data.
+
+    - doctors.json:   doctor table (index -> id, speciality); ids are never renumbered
+    - open.json:      slots visible in the last run with their first_seen minute
+    - intervals.bin:  append-only fixed-width int32 records
+                      (doctor_idx, slot_minute, first_seen_minute, vanished_minute)
+
+    A (doctor, slot) pair stays in open.json while it is visible and is appended to
+    intervals.bin once a run that actually looked at its time no longer returns it.
+    Slots that have passed are dropped without a record, slots beyond what the run
+    covered stay open, and doctors whose scrape failed are not observed at all.
+    """
+
+    def __init__(self, data_dir: str = "data", run_time: Optional[float] = None):
+        self.dir = os.path.join(data_dir, "history")
+        if not os.path.exists(self.dir):
+            os.makedirs(self.dir)
+        self.doctors_path = os.path.join(self.dir, "doctors.json")
+        self.open_path = os.path.join(self.dir, "open.json")
+        self.intervals_path = os.path.join(self.dir, "intervals.bin")
+
+        self.run_minute = int(run_time if run_time is not None else time.time()) // 60
+        self.doctors: List[dict] = self._load_json(self.doctors_path, [])
+        self.doctor_index: Dict[str, int] = {d["id"]: i for i, d in enumerate(self.doctors)}
+        # {doctor_idx (str, JSON key): {slot_minute (str): first_seen_minute}}
+        self.open: Dict[str, Dict[str, int]] = self._load_json(self.open_path, {})
+        self._closed = array(RECORD_TYPECODE)
+
+    @staticmethod
+    def _load_json(path, default):
+        if not os.path.exists(path):
+            return default
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except json.JSONDecodeError:
+            return default
+
+    @staticmethod
+    def _write_json(path, data):
+        with atomic_write(path) as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+
+    def _doctor_idx(self, doctor_id: str, speciality) -> int:
+        idx = self.doctor_index.get(doctor_id)
+        if idx is None:
+            idx = len(self.doctors)
+            self.doctors.append({"id": doctor_id, "speciality": speciality})
+            self.doctor_index[doctor_id] = idx
+        else:
+            self.doctors[idx]["speciality"] = speciality
+        return idx
+
+    # --- Write path ---
+
+    def observe(self, doctor_id: str, speciality, slots: Iterable[str],
+                covered_until: Optional[SlotValue] = None):
+        """
+        Records the slots one doctor shows in the current run.
+        covered_until: last slot time the scraper actually looked at (naive Vienna
+        datetime, ISO string or epoch minutes). Defaults to the last returned slot,
+        so slots beyond a truncated fetch are never recorded as vanished.
+        """
+        idx = self._doctor_idx(doctor_id, speciality)
+        key = str(idx)
+        current = {m for m in map(to_epoch_minutes, slots) if m is not None}
+        previous = self.open.get(key, {})
+
+        if covered_until is None:
+            cover = max(current) if current else None
+        elif isinstance(covered_until, datetime):
+            cover = to_epoch_minutes(covered_until.isoformat())
+        else:
+            cover = to_epoch_minutes(covered_until)
+
+        still_open = {}
+        for slot_key, first_seen in previous.items():
+            slot_minute = int(slot_key)
+            if slot_minute in current or slot_minute < self.run_minute:
+                # Still visible, or simply passed (not a booking)
+                continue
+            if cover is not None and slot_minute <= cover:
+                self._closed.extend((idx, slot_minute, first_seen, self.run_minute))
+            else:
+                # Not looked at in this run
+                still_open[slot_key] = first_seen
+
+        for m in current:
+            still_open[str(m)] = previous.get(str(m), self.run_minute)
+        self.open[key] = dict(sorted(still_open.items(), key=lambda item: int(item[0])))
+
+    def flush(self):
+        """Appends closed intervals and persists the doctor table and open slots."""
+        if self._closed:
+            with open(self.intervals_path, 'ab') as f:
+                self._closed.tofile(f)
+            self._closed = array(RECORD_TYPECODE)
+        self._write_json(self.doctors_path, self.doctors)
+        self._write_json(self.open_path, self.open)
+
+    # --- Read path ---
+
+    def _load_intervals(self) -> np.ndarray:
+        """intervals.bin as an (n, 4) int32 matrix, one row per record."""
+        if not os.path.exists(self.intervals_path):
+            return np.empty((0, RECORD_FIELDS), dtype=RECORD_DTYPE)
+        return np.fromfile(self.intervals_path, dtype=RECORD_DTYPE).reshape(-1, RECORD_FIELDS)
+
+    def query(self,
+              doctor_id: Optional[str] = None,
+              speciality: Optional[str] = None,
+              start: Optional[str] = None,
+              end: Optional[str] = None,
+              include_open: bool = True) -> List[dict]:
+        """
+        Slot lifetimes, filtered by doctor, speciality (substring match) and slot time
+        window [start, end) as ISO strings. 'vanished' is None for still visible slots.
+        """
+        wanted = None
+        if doctor_id is not None:
+            wanted = {self.doctor_index[doctor_id]} if doctor_id in self.doctor_index else set()
+        if speciality is not None:
+            spec_lower = speciality.lower()
+            by_spec = {
+                i for i, d in enumerate(self.doctors)
+                if spec_lower in str(d.get("speciality", "")).lower()
+            }
+            wanted = by_spec if wanted is None else wanted & by_spec
+        lo = to_epoch_minutes(start) if start else None
+        hi = to_epoch_minutes(end) if end else None
+
+        def keep(idx, slot_minute):
+            if wanted is not None and idx not in wanted:
+                return False
+            if lo is not None and slot_minute < lo:
+                return False
+            if hi is not None and slot_minute >= hi:
+                return False
+            return True
+
+        records = self._load_intervals()
+        mask = np.ones(len(records), dtype=bool)
+        if wanted is not None:
+            mask &= np.isin(records[:, 0], np.fromiter(wanted, dtype=RECORD_DTYPE, count=len(wanted)))
+        if lo is not None:
+            mask &= records[:, 1] >= lo
+        if hi is not None:
+            mask &= records[:, 1] < hi
+
+        results = [self._row(int(idx), int(slot_minute), int(seen), int(vanished))
+                   for idx, slot_minute, seen, vanished in records[mask]]
+
+        if include_open:
+            for key, slots in self.open.items():
+                idx = int(key)
+                if wanted is not None and idx not in wanted:
+                    continue
+                for slot_key, first_seen in slots.items():
+                    if keep(idx, int(slot_key)):
+                        results.append(self._row(idx, int(slot_key), first_seen, None))
+        return results
+
+    def _row(self, idx: int, slot_minute: int, first_seen: int, vanished: Optional[int]) -> dict:
+        return {
+            "doctor_id": self.doctors[idx]["id"],
+            "slot": _minute_to_iso(slot_minute),
+            "first_seen": _minute_to_iso(first_seen),
+            "vanished": _minute_to_iso(vanished) if vanished is not None else None,
+            # Minutes the slot was bookable before it disappeared (None = still open)
+            "lifetime_minutes": (vanished - first_seen) if vanished is not None else None,
+            "booked_early": vanished is not None and vanished < slot_minute,
+        }
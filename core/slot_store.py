@@ -0,0 +1,128 @@
+from datetime import date, datetime, time
+from typing import List, Optional
+import numpy as np
+
+MINUTES_PER_DAY = 24 * 60
+
+
+def _to_minute(value) -> np.datetime64:
+    if isinstance(value, datetime):
+        return np.datetime64(value, "m")
+    if isinstance(value, date):
+        return np.datetime64(datetime.combine(value, time.min), "m")
+    return np.datetime64(value, "m")
+
+
+class SlotSelection:
+    """
+    Slots matching a query, in chronological order. The arrays are views into the
+    store when only a date window was applied.
+    """
+
+    def __init__(self, times: np.ndarray, doctor_idx: np.ndarray, slot_pos: np.ndarray):
+        self.times = times
+        self.doctor_idx = doctor_idx
+        self.slot_pos = slot_pos
+
+    def __len__(self):
+        return len(self.times)
+
+    def by_doctor(self):
+        """
+        (doctors, next_slots, slot_positions): matching doctor positions, their earliest
+        matching slot and, per doctor, the indexes into doc["slots"] in time order.
+        """
+        if not len(self.doctor_idx):
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype="datetime64[m]"), []
+        # Stable sort keeps the chronological order within each doctor
+        order = np.argsort(self.doctor_idx, kind="stable")
+        grouped = self.doctor_idx[order]
+        starts = np.flatnonzero(np.r_[True, grouped[1:] != grouped[:-1]])
+        doctors = grouped[starts]
+        next_slots = self.times[order[starts]]
+        slot_positions = np.split(self.slot_pos[order], starts[1:])
+        return doctors, next_slots, slot_positions
+
+
+class SlotStore:
+    """
+    Columnar copy of all consolidated slots: one sorted datetime64[m] array plus the
+    doctor position and index into doc["slots"] of every slot. Built once per data
+    version (from_doctors, or zero-copy from_snapshot) and shared across sessions;
+    the doctor dicts themselves are never copied.
+    """
+
+    def __init__(self, times: np.ndarray, doctor_idx: np.ndarray, slot_pos: np.ndarray, size: int,
+                 minute_of_day: Optional[np.ndarray] = None, weekday: Optional[np.ndarray] = None):
+        # Columns must already be in chronological order
+        self.size = size
+        self.times = times
+        self.doctor_idx = doctor_idx
+        self.slot_pos = slot_pos
+
+        if minute_of_day is None or weekday is None:
+            minutes = self.times.astype(np.int64)
+            minute_of_day = (minutes % MINUTES_PER_DAY).astype(np.int16)
+            # 1970-01-01 was a Thursday; Monday = 0 like datetime.weekday()
+            weekday = ((minutes // MINUTES_PER_DAY + 3) % 7).astype(np.int8)
+        self.minute_of_day = minute_of_day
+        self.weekday = weekday
+
+    @classmethod
+    def from_doctors(cls, doctors: List[dict]) -> "SlotStore":
+        size = len(doctors)
+        counts = [len(doc["slots"]) for doc in doctors]
+        total = sum(counts)
+        times = np.fromiter(
+            (s["datetime"] for doc in doctors for s in doc["slots"]),
+            dtype="datetime64[m]", count=total,
+        )
+        doctor_idx = np.repeat(np.arange(size, dtype=np.int32), counts)
+        slot_pos = np.concatenate([np.arange(c, dtype=np.int32) for c in counts]) if total else np.empty(0, dtype=np.int32)
+
+        order = np.argsort(times, kind="stable")
+        return cls(times[order], doctor_idx[order], slot_pos[order], size)
+
+    @classmethod
+    def from_snapshot(cls, snapshot) -> "SlotStore":
+        """Zero-copy store over the presorted columns of a core.snapshot.Snapshot."""
+        a = snapshot.a
+        return cls(a["sorted_minute"].view("datetime64[m]"), a["sorted_doctor"], a["sorted_slot_pos"],
+                   snapshot.size, a["sorted_minute_of_day"], a["sorted_weekday"])
+
+    def select(self,
+               start_date=None,
+               end_date=None,
+               weekdays: Optional[List[int]] = None,
+               time_from: Optional[time] = None,
+               time_to: Optional[time] = None,
+               doctor_mask: Optional[np.ndarray] = None) -> SlotSelection:
+        """
+        Slots with start_date <= date <= end_date (both inclusive days), optionally
+        restricted to weekdays (0 = Monday), a time of day window [time_from, time_to)
+        and doctors where doctor_mask (bool array over doctor positions) is True.
+        """
+        lo = 0 if start_date is None else np.searchsorted(self.times, _to_minute(start_date), side="left")
+        if end_date is None:
+            hi = len(self.times)
+        else:
+            day_end = _to_minute(end_date) + np.timedelta64(MINUTES_PER_DAY, "m")
+            hi = np.searchsorted(self.times, day_end, side="left")
+        window = slice(lo, hi)
+
+        mask = None
+        if weekdays is not None:
+            mask = np.isin(self.weekday[window], weekdays)
+        if time_from is not None or time_to is not None:
+            tod = self.minute_of_day[window]
+            from_min = time_from.hour * 60 + time_from.minute if time_from else 0
+            to_min = time_to.hour * 60 + time_to.minute if time_to else MINUTES_PER_DAY
+            tod_mask = (tod >= from_min) & (tod < to_min)
+            mask = tod_mask if mask is None else mask & tod_mask
+        if doctor_mask is not None:
+            doc_mask = doctor_mask[self.doctor_idx[window]]
+            mask = doc_mask if mask is None else mask & doc_mask
+
+        if mask is None:
+            return SlotSelection(self.times[window], self.doctor_idx[window], self.slot_pos[window])
+        return SlotSelection(self.times[window][mask], self.doctor_idx[window][mask], self.slot_pos[window][mask])
@@ -0,0 +1,278 @@
+import json
+import mmap
+import os
+import struct
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, List, Optional
+import numpy as np
+from .database import atomic_write
+from .slot_store import MINUTES_PER_DAY
+
+# Binary snapshot of the consolidated dashboard model, written by main.py next to
+# dashboard_model.json. Dashboard processes mmap it and use the arrays zero-copy,
+# so N workers share one page-cache copy.
+SNAPSHOT_FILE = "dashboard_model.bin"
+SNAPSHOT_MAGIC = b"TDSNAP\x00\x01"
+SNAPSHOT_VERSION = 1
+ALIGN = 8
+
+# Layout: magic (8 bytes) | header length (uint32) | JSON header | aligned sections.
+# The header maps section name -> [offset, dtype, count].
+#
+# strings_blob / strings_offsets   string table (UTF-8 bytes, int64 offsets, n+1)
+# doc_*                            one row per doctor group (string ids, -1 = None)
+# doc_insurance_start/_count       slice into insurance_sids
+# doc_slot_start/_count            slice into the slot_* columns (per doctor, in time order)
+# slot_*                           one row per slot, doctor-contiguous
+# sorted_*                         all slots in global time order (core.slot_store.SlotStore columns)
+
+
+class _StringTable:
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    def add(self, value) -> int:
+        if value is None:
+            return -1
+        value = str(value)
+        sid = self.ids.get(value)
+        if sid is None:
+            sid = self.ids[value] = len(self.values)
+            self.values.append(value)
+        return sid
+
+    def arrays(self):
+        encoded = [v.encode("utf-8") for v in self.values]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        if encoded:
+            offsets[1:] = np.cumsum([len(b) for b in encoded])
+        return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+def _nan_if_none(value):
+    return np.nan if value is None else float(value)
+
+
+def build_snapshot_sections(doctors: List[dict]) -> Dict[str, np.ndarray]:
+    """Columnar arrays for consolidated doctor groups (core.read_model.consolidate_data)."""
+    strings = _StringTable()
+    n = len(doctors)
+    doc_cols = {k: np.empty(n, dtype=np.int32) for k in (
+        "doc_name", "doc_speciality", "doc_address", "doc_booking_url",
+        "doc_insurance_start", "doc_insurance_count", "doc_slot_start", "doc_slot_count",
+    )}
+    lats = np.empty(n, dtype=np.float64)
+    lons = np.empty(n, dtype=np.float64)
+    insurance_sids: List[int] = []
+    slot_minute: List[datetime] = []
+    slot_cols = {k: [] for k in ("slot_service", "slot_category", "slot_color", "slot_booking_url")}
+    slot_show_time: List[int] = []
+
+    for pos, doc in enumerate(doctors):
+        doc_cols["doc_name"][pos] = strings.add(doc.get("name"))
+        doc_cols["doc_speciality"][pos] = strings.add(doc.get("speciality"))
+        doc_cols["doc_address"][pos] = strings.add(doc.get("address"))
+        doc_cols["doc_booking_url"][pos] = strings.add(doc.get("booking_url"))
+        lats[pos] = _nan_if_none(doc.get("latitude"))
+        lons[pos] = _nan_if_none(doc.get("longitude"))
+
+        insurances = doc.get("insurance") or []
+        doc_cols["doc_insurance_start"][pos] = len(insurance_sids)
+        doc_cols["doc_insurance_count"][pos] = len(insurances)
+        insurance_sids.extend(strings.add(i) for i in insurances)
+
+        slots = doc["slots"]
+        doc_cols["doc_slot_start"][pos] = len(slot_minute)
+        doc_cols["doc_slot_count"][pos] = len(slots)
+        for s in slots:
+            slot_minute.append(s["datetime"])
+            slot_cols["slot_service"].append(strings.add(s.get("service_name")))
+            slot_cols["slot_category"].append(strings.add(s.get("category")))
+            slot_cols["slot_color"].append(strings.add(s.get("color")))
+            slot_cols["slot_booking_url"].append(strings.add(s.get("booking_url")))
+            slot_show_time.append(1 if s.get("show_time", True) else 0)
+
+    # Naive Vienna datetimes as minutes, same convention as SlotStore's datetime64[m]
+    minutes = np.array(slot_minute, dtype="datetime64[m]").astype(np.int64)
+    counts = doc_cols["doc_slot_count"]
+    doctor_idx = np.repeat(np.arange(n, dtype=np.int32), counts)
+    slot_pos = np.concatenate([np.arange(c, dtype=np.int32) for c in counts]) if len(minutes) else np.empty(0, dtype=np.int32)
+    order = np.argsort(minutes, kind="stable")
+    sorted_minutes = minutes[order]
+
+    blob, offsets = strings.arrays()
+    sections = {
+        "strings_blob": blob,
+        "strings_offsets": offsets,
+        "doc_latitude": lats,
+        "doc_longitude": lons,
+        "insurance_sids": np.asarray(insurance_sids, dtype=np.int32),
+        "slot_minute": minutes,
+        "slot_show_time": np.asarray(slot_show_time, dtype=np.int8),
+        "sorted_minute": sorted_minutes,
+        "sorted_doctor": doctor_idx[order],
+        "sorted_slot_pos": slot_pos[order],
+        "sorted_minute_of_day": (sorted_minutes % MINUTES_PER_DAY).astype(np.int16),
+        "sorted_weekday": ((sorted_minutes // MINUTES_PER_DAY + 3) % 7).astype(np.int8),
+    }
+    sections.update(doc_cols)
+    sections.update({k: np.asarray(v, dtype=np.int32) for k, v in slot_cols.items()})
+    return sections
+
+
+def write_snapshot(doctors: List[dict], data_dir: str = "data") -> str:
+    """Writes the snapshot atomically; open mmaps of the previous file stay valid."""
+    path = os.path.join(data_dir, SNAPSHOT_FILE)
+    sections = build_snapshot_sections(doctors)
+
+    # Offsets are relative to the start of the data area, which begins aligned after the header
+    layout = {}
+    offset = 0
+    for name, arr in sections.items():
+        offset = (offset + ALIGN - 1) // ALIGN * ALIGN
+        layout[name] = [offset, arr.dtype.str, int(arr.size)]
+        offset += arr.nbytes
+    header = json.dumps({
+        "version": SNAPSHOT_VERSION,
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "doctors": len(doctors),
+        "sections": layout,
+    }).encode("utf-8")
+    prefix_len = len(SNAPSHOT_MAGIC) + 4 + len(header)
+    data_start = (prefix_len + ALIGN - 1) // ALIGN * ALIGN
+
+    with atomic_write(path, 'wb') as f:
+        f.write(SNAPSHOT_MAGIC)
+        f.write(struct.pack("<I", len(header)))
+        f.write(header)
+        for name, arr in sections.items():
+            f.seek(data_start + layout[name][0])
+            f.write(np.ascontiguousarray(arr).tobytes())
+        # Empty trailing sections still need their offset inside the file
+        f.truncate(data_start + offset)
+    print(f"[Snapshot] Wrote {len(doctors)} groups to {path} ({os.path.getsize(path) // 1024} KiB)")
+    return path
+
+
+class Snapshot:
+    """
+    Read-only view of a snapshot file. All arrays are np.frombuffer views of one
+    mmap; nothing is parsed or copied until a doctor is materialized.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+            raise ValueError(f"{path} is not a dashboard snapshot")
+        (header_len,) = struct.unpack_from("<I", self._mm, len(SNAPSHOT_MAGIC))
+        header_start = len(SNAPSHOT_MAGIC) + 4
+        header = json.loads(self._mm[header_start:header_start + header_len])
+        if header.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"{path} has snapshot version {header.get('version')}")
+        data_start = (header_start + header_len + ALIGN - 1) // ALIGN * ALIGN
+
+        self.size = header["doctors"]
+        self.a: Dict[str, np.ndarray] = {
+            name: np.frombuffer(self._mm, dtype=np.dtype(dtype), count=count, offset=data_start + offset)
+            for name, (offset, dtype, count) in header["sections"].items()
+        }
+        self.string = lru_cache(maxsize=None)(self._string)
+
+    def _string(self, sid: int) -> Optional[str]:
+        if sid < 0:
+            return None
+        offsets = self.a["strings_offsets"]
+        return self.a["strings_blob"][offsets[sid]:offsets[sid + 1]].tobytes().decode("utf-8")
+
+    @property
+    def latitudes(self) -> np.ndarray:
+        return self.a["doc_latitude"]
+
+    @property
+    def longitudes(self) -> np.ndarray:
+        return self.a["doc_longitude"]
+
+    def doctor_meta(self, pos: int) -> dict:
+        """Doctor group without slots (what the facet index needs)."""
+        a = self.a
+        start, count = a["doc_insurance_start"][pos], a["doc_insurance_count"][pos]
+        lat, lon = a["doc_latitude"][pos], a["doc_longitude"][pos]
+        return {
+            "name": self.string(int(a["doc_name"][pos])),
+            "speciality": self.string(int(a["doc_speciality"][pos])),
+            "address": self.string(int(a["doc_address"][pos])),
+            "insurance": [self.string(int(s)) for s in a["insurance_sids"][start:start + count]],
+            "booking_url": self.string(int(a["doc_booking_url"][pos])),
+            "latitude": None if np.isnan(lat) else float(lat),
+            "longitude": None if np.isnan(lon) else float(lon),
+        }
+
+    def doctor(self, pos: int) -> dict:
+        """Full doctor group in the consolidate_data() shape."""
+        a = self.a
+        doc = self.doctor_meta(pos)
+        start, count = int(a["doc_slot_start"][pos]), int(a["doc_slot_count"][pos])
+        slots = []
+        for i in range(start, start + count):
+            dt = np.datetime64(int(a["slot_minute"][i]), "m").astype(datetime)
+            slots.append({
+                "datetime": dt,
+                "time_str": dt.strftime("%H:%M"),
+                "date_str": dt.strftime("%d.%m.%Y"),
+                "day_name": dt.strftime("%a"),
+                "service_name": self.string(int(a["slot_service"][i])),
+                "category": self.string(int(a["slot_category"][i])),
+                "color": self.string(int(a["slot_color"][i])),
+                "booking_url": self.string(int(a["slot_booking_url"][i])),
+                "show_time": bool(a["slot_show_time"][i]),
+            })
+        doc["slots"] = slots
+        doc["next_slot"] = slots[0]["datetime"] if slots else None
+        return doc
+
+
+class SnapshotDoctors:
+    """
+    Sequence of doctor groups backed by a Snapshot; doctors are materialized on
+    access (only the rendered cards), with a bounded cache.
+    """
+
+    def __init__(self, snapshot: Snapshot, cache_size: int = 1024):
+        self.snapshot = snapshot
+        self._get = lru_cache(maxsize=cache_size)(snapshot.doctor)
+
+    def __len__(self):
+        return self.snapshot.size
+
+    def __getitem__(self, pos):
+        if isinstance(pos, slice):
+            return [self._get(i) for i in range(*pos.indices(len(self)))]
+        if pos < 0:
+            pos += len(self)
+        if not 0 <= pos < len(self):
+            raise IndexError(pos)
+        return self._get(pos)
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def meta(self) -> List[dict]:
+        return [self.snapshot.doctor_meta(i) for i in range(len(self))]
+
+
+def load_snapshot(data_dir: str = "data", source_path: Optional[str] = None) -> Optional[Snapshot]:
+    """The snapshot, or None if missing, unreadable or older than source_path."""
+    path = os.path.join(data_dir, SNAPSHOT_FILE)
+    if not os.path.exists(path):
+        return None
+    if source_path and os.path.exists(source_path) and os.path.getmtime(source_path) > os.path.getmtime(path):
+        return None
+    try:
+        return Snapshot(path)
+    except (ValueError, OSError) as e:
+        print(f"[Snapshot] Ignoring {path}: {e}")
+        return None
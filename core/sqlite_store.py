@@ -0,0 +1,252 @@
+import json
+import os
+import sqlite3
+from contextlib import contextmanager
+from typing import Iterable, List, Dict, Optional
+from .models import Doctor
+from .slot_codec import SLOT_FORMAT_ISO, to_epoch_minutes, to_local_iso
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS doctors (
+    id          TEXT PRIMARY KEY,
+    name        TEXT NOT NULL,
+    address     TEXT,
+    booking_url TEXT,
+    show_time   INTEGER NOT NULL DEFAULT 1,
+    latitude    REAL,
+    longitude   REAL,
+    raw         TEXT NOT NULL          -- full model_dump() as JSON (for load_data)
+);
+CREATE TABLE IF NOT EXISTS doctor_specialities (
+    doctor_id   TEXT NOT NULL REFERENCES doctors(id) ON DELETE CASCADE,
+    speciality  TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS doctor_insurances (
+    doctor_id   TEXT NOT NULL REFERENCES doctors(id) ON DELETE CASCADE,
+    insurance   TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS slots (
+    doctor_id    TEXT NOT NULL REFERENCES doctors(id) ON DELETE CASCADE,
+    start_time   TEXT NOT NULL,        -- Vienna local time, ISO
+    start_minute INTEGER               -- epoch minutes (core.slot_codec)
+);
+CREATE INDEX IF NOT EXISTS idx_spec_speciality ON doctor_specialities(speciality, doctor_id);
+CREATE INDEX IF NOT EXISTS idx_spec_doctor ON doctor_specialities(doctor_id);
+CREATE INDEX IF NOT EXISTS idx_ins_insurance ON doctor_insurances(insurance, doctor_id);
+CREATE INDEX IF NOT EXISTS idx_ins_doctor ON doctor_insurances(doctor_id);
+CREATE INDEX IF NOT EXISTS idx_slots_start ON slots(start_time, doctor_id);
+CREATE INDEX IF NOT EXISTS idx_slots_doctor ON slots(doctor_id, start_time);
+CREATE INDEX IF NOT EXISTS idx_doctors_coords ON doctors(latitude, longitude);
+"""
+
+# Columns added after the first schema version: (table, column, type)
+MIGRATIONS = [
+    ("slots", "start_minute", "INTEGER"),
+]
+
+
+class SQLiteBatch:
+    """Same contract as database.DBBatch, backed by one SQLite transaction."""
+
+    def __init__(self, manager: "SQLiteDBManager", checkpoint_every: int = 0):
+        self.manager = manager
+        self.conn = manager.connect()
+        self.checkpoint_every = checkpoint_every
+        self.active_ids: Optional[set] = None
+        self.upserted_ids = set()
+        self.upserted = 0
+        self._pending = 0
+
+    def upsert(self, doctor: Doctor):
+        self.manager._upsert(self.conn, self.manager.serialize(doctor))
+        self.upserted_ids.add(doctor.id)
+        self.upserted += 1
+        self._pending += 1
+        print(f"[DB] Saved/Updated doctor: {doctor.name} ({len(doctor.slots)} slots)")
+        if self.checkpoint_every and self._pending >= self.checkpoint_every:
+            self.commit()
+
+    def remove_stale(self, active_ids: Iterable[str]):
+        self.active_ids = set(active_ids)
+
+    def commit(self):
+        if self.active_ids is not None:
+            existing = [row[0] for row in self.conn.execute("SELECT id FROM doctors")]
+            stale = [k for k in existing if k not in self.active_ids and k not in self.upserted_ids]
+            for k in stale:
+                self.manager._delete(self.conn, k)
+                print(f"[DB] Removed stale doctor: {k}")
+        self.conn.commit()
+        self._pending = 0
+
+    def close(self):
+        self.conn.close()
+
+
+class SQLiteDBManager:
+    """
+    SQLite storage behind the DBManager interface (load_data, batch, save_doctor,
+    remove_stale_doctors). Doctors, specialities, insurances and slots are stored
+    normalized and indexed, so the dashboard's fallback path (no snapshot / read model)
+    queries the upcoming slots with next_slots() instead of loading everything.
+    """
+
+    def __init__(self, data_dir: str = "data", file_name: str = "appointments.sqlite",
+                 slot_format: Optional[str] = None):
+        self.data_dir = data_dir
+        self.slot_format = (slot_format or os.environ.get("SLOT_FORMAT", SLOT_FORMAT_ISO)).lower()
+        self.file_path = os.path.join(self.data_dir, file_name)
+        if not os.path.exists(self.data_dir):
+            os.makedirs(self.data_dir)
+        with self._open() as conn:
+            conn.executescript(SCHEMA)
+            for table, column, col_type in MIGRATIONS:
+                columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {col_type}")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_slots_minute ON slots(start_minute, doctor_id)")
+
+    def connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.file_path)
+        conn.execute("PRAGMA foreign_keys = ON")
+        # WAL: readers (dashboard) are never blocked by the scraper's write transaction
+        conn.execute("PRAGMA journal_mode = WAL")
+        return conn
+
+    @contextmanager
+    def _open(self):
+        conn = self.connect()
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    # --- Write path ---
+
+    def serialize(self, doctor: Doctor) -> dict:
+        from .database import serialize_doctor
+        return serialize_doctor(doctor, self.slot_format)
+
+    def _delete(self, conn: sqlite3.Connection, doctor_id: str):
+        for table in ("slots", "doctor_specialities", "doctor_insurances"):
+            conn.execute(f"DELETE FROM {table} WHERE doctor_id = ?", (doctor_id,))
+        conn.execute("DELETE FROM doctors WHERE id = ?", (doctor_id,))
+
+    def _upsert(self, conn: sqlite3.Connection, doc: dict):
+        doctor_id = doc["id"]
+        self._delete(conn, doctor_id)
+        conn.execute(
+            "INSERT INTO doctors (id, name, address, booking_url, show_time, latitude, longitude, raw) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (doctor_id, doc.get("name", ""), doc.get("address", ""), doc.get("booking_url", ""),
+             1 if doc.get("show_time", True) else 0, doc.get("latitude"), doc.get("longitude"),
+             json.dumps(doc, ensure_ascii=False))
+        )
+        specs = doc.get("speciality") or []
+        if isinstance(specs, str):
+            specs = [s.strip() for s in specs.split(",") if s.strip()]
+        conn.executemany("INSERT INTO doctor_specialities (doctor_id, speciality) VALUES (?, ?)",
+                         [(doctor_id, s) for s in specs])
+        conn.executemany("INSERT INTO doctor_insurances (doctor_id, insurance) VALUES (?, ?)",
+                         [(doctor_id, i) for i in doc.get("insurance", [])])
+        # Slots are normalized once here: local ISO for range queries, epoch minutes as int
+        slot_rows = []
+        for s in doc.get("slots", []):
+            minute = to_epoch_minutes(s)
+            if minute is not None:
+                slot_rows.append((doctor_id, to_local_iso(minute), minute))
+        conn.executemany("INSERT INTO slots (doctor_id, start_time, start_minute) VALUES (?, ?, ?)", slot_rows)
+
+    @contextmanager
+    def batch(self, checkpoint_every: int = 0):
+        batch = SQLiteBatch(self, checkpoint_every=checkpoint_every)
+        try:
+            yield batch
+        finally:
+            batch.commit()
+            batch.close()
+
+    def save_doctor(self, doctor: Doctor):
+        with self.batch() as batch:
+            batch.upsert(doctor)
+
+    def remove_stale_doctors(self, active_ids: List[str]):
+        """Removes doctors from the DB that are not in the active_ids list."""
+        with self.batch() as batch:
+            batch.remove_stale(active_ids)
+
+    # --- Read path ---
+
+    def load_data(self) -> Dict[str, dict]:
+        """Same shape as the JSON backend: {doctor_id: doctor_dict}."""
+        with self._open() as conn:
+            return {row[0]: json.loads(row[1]) for row in conn.execute("SELECT id, raw FROM doctors")}
+
+    def next_slots(self,
+                   specialities: Optional[List[str]] = None,
+                   insurances: Optional[List[str]] = None,
+                   start: Optional[str] = None,
+                   end: Optional[str] = None,
+                   per_doctor: int = 50) -> Dict[str, dict]:
+        """
+        Doctors with slots in [start, end] (ISO strings, end inclusive by day),
+        optionally filtered by speciality/insurance. Returns {doctor_id: doctor_dict}
+        with 'slots' restricted to the window, like load_data().
+        """
+        where = []
+        params: list = []
+        if start:
+            where.append("s.start_time >= ?")
+            params.append(start)
+        if end:
+            # ISO strings sort chronologically; '~' sorts after any time suffix
+            where.append("s.start_time <= ?")
+            params.append(end + "~")
+        if specialities:
+            where.append("s.doctor_id IN (SELECT doctor_id FROM doctor_specialities WHERE speciality IN (%s))"
+                         % ",".join("?" * len(specialities)))
+            params.extend(specialities)
+        if insurances:
+            where.append("s.doctor_id IN (SELECT doctor_id FROM doctor_insurances WHERE insurance IN (%s))"
+                         % ",".join("?" * len(insurances)))
+            params.extend(insurances)
+
+        sql = "SELECT s.doctor_id, s.start_time FROM slots s"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY s.start_time"
+
+        result: Dict[str, dict] = {}
+        with self._open() as conn:
+            slots_by_doctor: Dict[str, List[str]] = {}
+            for doctor_id, start_time in conn.execute(sql, params):
+                doctor_slots = slots_by_doctor.setdefault(doctor_id, [])
+                if len(doctor_slots) < per_doctor:
+                    doctor_slots.append(start_time)
+            for doctor_id, doctor_slots in slots_by_doctor.items():
+                row = conn.execute("SELECT raw FROM doctors WHERE id = ?", (doctor_id,)).fetchone()
+                if row:
+                    doc = json.loads(row[0])
+                    doc["slots"] = doctor_slots
+                    result[doctor_id] = doc
+        return result
+
+    # --- Migration ---
+
+    def import_json(self, json_path: str) -> int:
+        """Imports an existing appointments.json (JSON backend) into this database."""
+        with open(json_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        with self._open() as conn:
+            for doc in data.values():
+                self._upsert(conn, doc)
+        print(f"[DB] Migrated {len(data)} doctors from {json_path} to {self.file_path}")
+        return len(data)
+
+
+if __name__ == "__main__":
+    # Migration: python -m core.sqlite_store [data_dir]
+    import sys
+    data_dir = sys.argv[1] if len(sys.argv) > 1 else "data"
+    SQLiteDBManager(data_dir).import_json(os.path.join(data_dir, "appointments.json"))
@@ -1,10 +1,20 @@
 import streamlit as st
-import json
+import os
 import pandas as pd
+import numpy as np
 import streamlit.components.v1 as components
 from datetime import datetime, timedelta
 from core.geocoder import GeocodingService
-from core.filter_service import FilterService
+from core.filter_service import FilterService, SpatialIndex
+from core.facet_index import FacetIndex, INSURANCE_MODES
+from core.slot_store import SlotStore
+from core.snapshot import SNAPSHOT_FILE, SnapshotDoctors, load_snapshot
+from core.query_cache import QueryCache, file_version
+from core.card_renderer import PAGE_SIZE, render_card, hidden_slot_count
+from core.database import create_db_manager
+from core.sqlite_store import SQLiteDBManager
+from core.slot_codec import VIENNA
+from core.read_model import READ_MODEL_FILE, consolidate_data, load_read_model
 
 # --- Page Config ---
 st.set_page_config(
@@ -185,161 +195,118 @@ if 'search_filters' not in st.session_state:
 def get_geocoder():
     return GeocodingService()
 
-@st.cache_data(ttl=60)
-def load_data():
-    try:
-        with open("data/appointments.json", "r") as f:
-            data = json.load(f)
-        return data
-    except FileNotFoundError:
-        return {}
-
-def extract_city(address):
-    if not address: return "Unbekannt"
-    try:
-        parts = address.split(",")
-        if len(parts) > 1:
-            city_part = parts[-1].strip()
-            sub_parts = city_part.split(" ", 1)
-            if len(sub_parts) > 1 and sub_parts[0].isdigit() and len(sub_parts[0]) == 4:
-                return sub_parts[1]
-            return city_part
-        return address
-    except:
-        return "Unbekannt"
-
-def normalize_speciality(raw):
-    if isinstance(raw, list):
-        return ", ".join([normalize_single_speciality(s) for s in raw])
-    return normalize_single_speciality(raw)
-
-def normalize_single_speciality(raw):
-    if not isinstance(raw, str): return str(raw)
-    s = raw.lower()
-    if "allgemeinmedizin" in s: return "Allgemeinmedizin"
-    if "kinder" in s and "jugend" in s: return "Kinderheilkunde"
-    if "frauenheilkunde" in s or "gynäkologie" in s: return "Gynäkologie & Geburtshilfe"
-    if "innere medizin" in s: return "Innere Medizin"
-    if "zahn" in s or "kiefer" in s: return "Zahnmedizin / Kieferorthopädie"
-    if "orthopädie" in s: return "Orthopädie"
-    if "hno" in s or "hals" in s: return "HNO"
-    if "kardiologie" in s: return "Innere Medizin (Kardiologie)"
-    return raw
-
-def classify_service(name):
-    """Classifies a service name into Akut, Vorsorge, or Sonstiges (Currently all gray)."""
-    return "Sonstiges", "gray"
-
-def consolidate_data(doctors_json):
+@st.cache_resource
+def get_db_manager():
+    # JSON or SQLite, depending on DB_BACKEND (see core.database.create_db_manager)
+    return create_db_manager()
+
+def data_version():
     """
-    Consolidates granular doctor entries (Dr. X Akut, Dr. X Checkup) into single Grouped objects.
-    Returns a list of dicts representing unique Doctors/Groups with aggregated slots.
+    Changes exactly when the scraper writes new data: mtime/size of the data file
+    (plus SQLite's WAL) and of the precomputed read model. One os.stat per file and rerun.
     """
-    aggregated_doctors = {}
-    
-    import re
-    
-    for doc_id, doc in doctors_json.items():
-        # Identify Group ID and Service Name
-        raw_name = doc.get("name", "Unknown")
-        group_key = doc.get("group_id")
-        base_service_name = "Termin"
-        
-        # Regex to extract "Provider Name (Service)"
-        # e.g., "Perfect Smile Klagenfurt (Beratung)" -> "Perfect Smile Klagenfurt", "Beratung"
-        match = re.match(r"^(.*?)\s*\((.*?)\)$", raw_name)
-        
-        if match:
-            extracted_name = match.group(1).strip()
-            extracted_service = match.group(2).strip()
-            
-            if not group_key:
-                group_key = extracted_name
-            
-            # If the service name looks like a location or generic (e.g. just "Wolfsberg"), keep it.
-            # But usually it's "Beratung", "Schmerzen", etc.
-            base_service_name = extracted_service
-            
-        elif " | " in raw_name:
-             # Fallback for "Name | Service" pattern
-             parts = raw_name.split(" | ")
-             if not group_key:
-                 group_key = parts[0].strip()
-             if len(parts) > 1:
-                 base_service_name = parts[1].strip()
-        
-        if not group_key:
-            group_key = raw_name
-            
-        if group_key not in aggregated_doctors:
-            aggregated_doctors[group_key] = {
-                "name": group_key,
-                "speciality": normalize_speciality(doc.get("speciality", "")),
-                "address": doc.get("address", ""),
-                "insurance": doc.get("insurance", []),
-                "booking_url": doc.get("booking_url"), # Default URL
-                "latitude": doc.get("latitude"),
-                "longitude": doc.get("longitude"),
-                "slots": []
-            }
-        
-        def add_appt(slot_str, s_name):
-            try:
-                if slot_str.endswith("Z"):
-                    dt = datetime.fromisoformat(slot_str.replace("Z", "+00:00"))
-                else:
-                    dt = datetime.fromisoformat(slot_str)
-                if dt.tzinfo is not None:
-                    dt = dt.astimezone()
-                dt_naive = dt.replace(tzinfo=None)
-                
-                # Avoid duplicates (day, time, service)
-                slot_key = f"{dt_naive.isoformat()}"
-                if any(s["datetime"] == dt_naive and s["service_name"] == s_name for s in aggregated_doctors[group_key]["slots"]):
-                    return
-
-                category, color = classify_service(s_name)
-                aggregated_doctors[group_key]["slots"].append({
-                    "datetime": dt_naive,
-                    "time_str": dt_naive.strftime("%H:%M"),
-                    "date_str": dt_naive.strftime("%d.%m.%Y"),
-                    "day_name": dt_naive.strftime("%a"),
-                    "service_name": s_name,
-                    "category": category,
-                    "color": color, 
-                    "booking_url": doc.get("booking_url", aggregated_doctors[group_key]["booking_url"]),
-                    "show_time": doc.get("show_time", True)
-                })
-            except ValueError:
-                pass
-
-        # Collect slots from appointment_types or flat slots
-        app_types = doc.get("appointment_types", [])
-        has_typed_slots = False
-        for t in app_types:
-            if t.get("slots"):
-                label = t.get("name", base_service_name)
-                for s in t.get("slots", []):
-                    add_appt(s, label)
-                has_typed_slots = True
-        
-        if not has_typed_slots:
-            for s in doc.get("slots", []):
-                add_appt(s, base_service_name)
-                
-    # Convert to list and post-process
-    result_doctors = []
-    for key, data in aggregated_doctors.items():
-        if data["slots"]:
-            # Sort slots by time
-            data["slots"].sort(key=lambda x: x["datetime"])
-            # Calculate next available slot
-            data["next_slot"] = data["slots"][0]["datetime"]
-            result_doctors.append(data)
-            
-    # Sort doctors by earliest available slot by default (render_results will do final sort)
-    result_doctors.sort(key=lambda x: x["next_slot"])
-    return result_doctors
+    db_manager = get_db_manager()
+    return (
+        file_version(db_manager.file_path),
+        file_version(db_manager.file_path + "-wal"),
+        file_version(os.path.join(db_manager.data_dir, READ_MODEL_FILE)),
+        file_version(os.path.join(db_manager.data_dir, SNAPSHOT_FILE)),
+    )
+
+# All loaders below are keyed by data_version(): they run once per new scrape and
+# their results are shared by all sessions. max_entries=1 drops the previous version.
+# Widest date range the search offers ("Alles")
+MAX_RANGE_DAYS = 365
+
+@st.cache_data(max_entries=1)
+def load_data(version):
+    db_manager = get_db_manager()
+    if isinstance(db_manager, SQLiteDBManager):
+        # Only upcoming slots within the widest search range, filtered by the slots index
+        now = datetime.now(VIENNA).replace(tzinfo=None)
+        return db_manager.next_slots(
+            start=now.isoformat(timespec="minutes"),
+            end=(now + timedelta(days=MAX_RANGE_DAYS)).date().isoformat(),
+        )
+    return db_manager.load_data()
+
+@st.cache_resource(max_entries=1)
+def load_doctors(version):
+    """
+    Consolidated doctor groups. Prefers the binary snapshot written by main.py
+    (mmap'ed, doctors materialized on access), then the JSON read model; only falls
+    back to consolidating the raw data when both are missing or stale.
+    Shared by all sessions (cache_resource): treat the returned dicts as read-only.
+    """
+    db_manager = get_db_manager()
+    snapshot = load_snapshot(db_manager.data_dir, source_path=db_manager.file_path)
+    if snapshot is not None:
+        return SnapshotDoctors(snapshot)
+    model = load_read_model(db_manager.data_dir, source_path=db_manager.file_path)
+    if model is not None:
+        return model["doctors"]
+    return consolidate_data(load_data(version))
+
+# Index positions match the order of load_doctors(version)
+@st.cache_resource(max_entries=1)
+def get_spatial_index(version):
+    doctors = load_doctors(version)
+    if isinstance(doctors, SnapshotDoctors):
+        return SpatialIndex(doctors.snapshot.latitudes, doctors.snapshot.longitudes)
+    return FilterService().build_index(doctors)
+
+@st.cache_resource(max_entries=1)
+def get_facet_index(version):
+    doctors = load_doctors(version)
+    if isinstance(doctors, SnapshotDoctors):
+        # Slot-free doctor records: no slot is materialized for the facets
+        return FacetIndex(doctors.meta())
+    return FacetIndex(doctors)
+
+@st.cache_resource(max_entries=1)
+def get_slot_store(version):
+    doctors = load_doctors(version)
+    if isinstance(doctors, SnapshotDoctors):
+        return SlotStore.from_snapshot(doctors.snapshot)
+    return SlotStore.from_doctors(doctors)
+
+@st.cache_resource
+def get_query_cache():
+    # One cache per server process, shared by all sessions
+    return QueryCache()
+
+def search_doctors(all_doctors, version, specialities, insurance_mode, user_coords, start_date, end_date, sort_val):
+    """
+    Matching doctors in display order: (doctor positions, per-doctor slot indexes,
+    distances or None). Pure function of its arguments, so results can be shared.
+    """
+    # Distances to all doctors in one vectorized pass
+    distances = None
+    if user_coords and user_coords[0]:
+        distances = get_spatial_index(version).distances_from(user_coords[0], user_coords[1])
+
+    # Doctor Level Filters: intersections of the facet index postings
+    matches = get_facet_index(version).match(
+        specialities=specialities,
+        insurance_class=INSURANCE_MODES.get(insurance_mode),
+    )
+
+    # Slot Level Filter (Date range): bisect on the shared columnar slot store
+    doctor_mask = np.zeros(len(all_doctors), dtype=bool)
+    doctor_mask[matches] = True
+    selection = get_slot_store(version).select(
+        start_date, end_date, doctor_mask=doctor_mask
+    )
+    doctor_pos, next_slots, slot_positions = selection.by_doctor()
+
+    # Apply Sorting
+    if sort_val == "Entfernung (nächste zuerst)" and distances is not None:
+        order = np.argsort(distances[doctor_pos], kind="stable")
+    else:
+        order = np.argsort(next_slots, kind="stable")
+
+    ordered_distances = distances[doctor_pos[order]] if distances is not None else None
+    return doctor_pos[order], [slot_positions[i] for i in order.tolist()], ordered_distances
 
 # --- Component: Smooth Scroll Script ---
 def inject_smooth_scroll():
@@ -362,9 +329,9 @@ def inject_smooth_scroll():
 
 
 # --- Phase 1: Hero Search (Merged Logic) ---
-def render_hero(all_doctors, compact=False):
+def render_hero(all_doctors, version, compact=False):
     # Prepare lists (from doctors, not appointments)
-    available_specialities = sorted(list(set(d["speciality"] for d in all_doctors if d["speciality"])))
+    available_specialities = get_facet_index(version).specialities
     
     # Dynamic CSS class based on state
     hero_class = "hero-container compact" if compact else "hero-container"
@@ -404,7 +371,7 @@ def render_hero(all_doctors, compact=False):
             
         with col_ins:
             ins_def_idx = 0
-            modes = ["Alle Kassen", "Nur Kasse (ÖGK etc.)", "Wahlarzt/Privat"]
+            modes = list(INSURANCE_MODES)
             if defaults.get("insurance_mode") in modes:
                 ins_def_idx = modes.index(defaults["insurance_mode"])
                     
@@ -427,10 +394,12 @@ def render_hero(all_doctors, compact=False):
                 "date_range": (datetime.now().date(), datetime.now().date() + timedelta(days=365))
             }
             st.session_state.search_active = True
+            st.session_state.results_limit = PAGE_SIZE
+            st.session_state.expanded_cards = set()
             st.rerun()
 
 # --- Phase 2: Results View (Below Hero) ---
-def render_results(all_doctors):
+def render_results(all_doctors, version):
     filters = st.session_state.search_filters
     
     # Anchor for Scroll
@@ -450,44 +419,6 @@ def render_results(all_doctors):
     
     start_date = filters["date_range"][0]
     end_date = filters["date_range"][1]
-    public_insurances = {"ÖGK", "BVAEB", "SVS", "SVS-GW", "SVS-LW", "KFA", "Alle Kassen"}
-
-    filtered_doctors = []
-    
-    for doc in all_doctors:
-        # Doctor Level Filters
-        if filters["specialities"]:
-            doc_specs = [s.strip() for s in doc["speciality"].split(",")]
-            if not any(s in filters["specialities"] for s in doc_specs):
-                continue
-
-        doc_insurances = set(doc["insurance"])
-        if filters["insurance_mode"] == "Nur Kasse (ÖGK etc.)":
-             if not (doc_insurances & public_insurances):
-                 continue
-        elif filters["insurance_mode"] == "Wahlarzt/Privat":
-             if "Wahlarzt" not in doc_insurances and "Privat" not in doc_insurances:
-                 continue
-                 
-        # Location Distance
-        if user_coords and user_coords[0]:
-            if doc["latitude"] and doc["longitude"]:
-                fs = FilterService()
-                doc["distance"] = fs.haversine_distance(user_coords[0], user_coords[1], doc["latitude"], doc["longitude"])
-            else:
-                doc["distance"] = float('inf')
-        
-        # Slot Level Filter (Date range and Category)
-        valid_slots = []
-        for slot in doc["slots"]:
-            if (start_date <= slot["datetime"].date() <= end_date):
-                valid_slots.append(slot)
-        
-        if valid_slots:
-            doc_to_show = doc.copy()
-            doc_to_show["slots"] = valid_slots
-            doc_to_show["next_slot"] = valid_slots[0]["datetime"]
-            filtered_doctors.append(doc_to_show)
 
     # --- Filter Expander & Sorting ---
     with st.expander("🛠️ Sortierung & Zeitraum anpassen", expanded=False):
@@ -509,89 +440,81 @@ def render_results(all_doctors):
                  st.session_state.search_filters["date_range"] = (today, today + timedelta(days=new_days))
                  st.rerun()
 
-    # Apply Sorting
-    if sort_val == "Entfernung (nächste zuerst)":
-        filtered_doctors.sort(key=lambda x: x.get("distance", float('inf')))
-    else:
-        filtered_doctors.sort(key=lambda x: x["next_slot"])
+    # Search: shared across sessions, keyed by the normalized filters and data version
+    coords_key = (round(user_coords[0], 4), round(user_coords[1], 4)) if user_coords and user_coords[0] else None
+    query_key = (
+        tuple(sorted(filters["specialities"])),
+        coords_key,
+        filters["insurance_mode"],
+        start_date,
+        end_date,
+        sort_val,
+    )
+    query_cache = get_query_cache()
+
+    def compute_search():
+        result = search_doctors(all_doctors, version, filters["specialities"], filters["insurance_mode"],
+                                coords_key, start_date, end_date, sort_val)
+        # Logged on misses only, so the server log shows how well sessions share results
+        stats = query_cache.stats()
+        print(f"[QueryCache] miss: {stats['entries']} entries, {stats['hits']} hits / {stats['misses']} misses "
+              f"({stats['hit_rate']:.0%}), {stats['evictions']} evictions")
+        return result
+
+    doctor_pos, slot_positions, distances = query_cache.get_or_compute(version, query_key, compute_search)
 
     # --- Display ---
-    st.markdown(f"**{len(filtered_doctors)} Ärzte** mit Terminen in {filters['location']}")
+    st.markdown(f"**{len(doctor_pos)} Ärzte** mit Terminen in {filters['location']}")
         
-    if not filtered_doctors:
+    if not len(doctor_pos):
          st.info("Keine Termine gefunden. Versuche es mit einem anderen Zeitraum, Ort oder Filter.")
          st.markdown('</div>', unsafe_allow_html=True)
          return
 
-    for doc in filtered_doctors:
+    # Only the current page of cards is rendered; "Mehr laden" adds the next page
+    limit = st.session_state.get("results_limit", PAGE_SIZE)
+    expanded_cards = st.session_state.setdefault("expanded_cards", set())
+
+    for i, pos in enumerate(doctor_pos[:limit].tolist()):
+        # Per-card view with the slots in the window; the shared doctor dict stays untouched
+        doc = dict(all_doctors[pos])
+        doc["slots"] = [all_doctors[pos]["slots"][j] for j in slot_positions[i].tolist()]
+        if distances is not None:
+            doc["distance"] = float(distances[i])
         with st.container():
-            dist_text = ""
-            if "distance" in doc and doc["distance"] < 1000: 
-                 dist_text = f"📍 {doc['distance']:.1f} km"
-            
-            badges = " ".join([f"<span class='badge' style='background:#e2e8f0; color:#4a5568; padding:2px 6px; border-radius:4px; font-size:0.8em; margin-right:4px;'>{i}</span>" for i in doc["insurance"][:3]])
-            
-            # Slots rendering
-            slots_html = ""
-            visible_slots = doc["slots"][:5]
-            hidden_slots = doc["slots"][5:]
-            
-            def format_slot(s):
-                color_map = {"red": "#e53e3e", "green": "#38a169", "gray": "#718096"}
-                bg_color = color_map.get(s["color"], "#718096")
-                return f"""
-<div style="display:flex; justify-content:space-between; align-items:center; background:#f7fafc; padding:8px; border-radius:6px; margin-bottom:4px; border-left:4px solid {bg_color};">
-    <div>
-        <span style="font-weight:bold; color:#2d3748;">{s['day_name']} {s['date_str']}</span>
-        {f'<span style="font-weight:800; color:{bg_color}; margin-left:8px;">{s["time_str"]}</span>' if s.get('show_time', True) else ''}
-        <span style="font-size:0.85em; color:#718096; margin-left:8px;">{s['service_name']}</span>
-    </div>
-    <a href="{s['booking_url']}" target="_blank" style="text-decoration:none; color:white; background:{bg_color}; padding:4px 12px; border-radius:12px; font-size:0.8em; font-weight:bold;">Buchen</a>
-</div>"""
-
-            slots_html = "".join([format_slot(s) for s in visible_slots])
-            
-            if hidden_slots:
-                hidden_html = "".join([format_slot(s) for s in hidden_slots])
-                slots_html += f"""
-<details style="margin-top:8px; cursor:pointer;">
-    <summary style="text-align:center; font-size:14px; color:#3182ce; font-weight:600; list-style:none; padding:8px; background:#ebf8ff; border-radius:6px;">
-        + {len(hidden_slots)} weitere Termine anzeigen
-    </summary>
-    <div style="margin-top:8px;">
-        {hidden_html}
-    </div>
-</details>"""
- 
-            st.html(f"""
-<div class="result-card">
-    <div style="display:flex; justify-content:space-between; align-items:start; margin-bottom:12px;">
-        <div>
-            <div class="card-doctor">{doc['name']}</div>
-            <div class="card-meta">{doc['speciality']} • {doc['address']}</div>
-            <div class="card-meta" style="margin-top:4px;">{dist_text}</div>
-            <div style="margin-top:8px;">{badges}</div>
-        </div>
-    </div>
-    <div>
-        {slots_html}
-    </div>
-</div>
-""")
+            expanded = doc["name"] in expanded_cards
+            st.html(render_card(doc, expanded=expanded))
+
+            # Hidden slots are only rendered once the card is expanded
+            hidden = hidden_slot_count(doc)
+            if hidden:
+                label = "Weniger Termine anzeigen" if expanded else f"+ {hidden} weitere Termine anzeigen"
+                if st.button(label, key=f"expand_{doc['name']}", use_container_width=True):
+                    if expanded:
+                        expanded_cards.discard(doc["name"])
+                    else:
+                        expanded_cards.add(doc["name"])
+                    st.rerun()
+
+    if len(doctor_pos) > limit:
+        remaining = len(doctor_pos) - limit
+        if st.button(f"Mehr laden ({remaining} weitere Ärzte)", key="load_more", use_container_width=True):
+            st.session_state.results_limit = limit + PAGE_SIZE
+            st.rerun()
             
     st.markdown('</div>', unsafe_allow_html=True)
  
 # --- Main Logic ---
 def main():
-    raw_data = load_data()
-    all_doctors = consolidate_data(raw_data)
+    version = data_version()
+    all_doctors = load_doctors(version)
     
     # Always render Hero
-    render_hero(all_doctors, compact=st.session_state.search_active)
+    render_hero(all_doctors, version, compact=st.session_state.search_active)
     
     # Render Results BELOW Hero if active
     if st.session_state.search_active:
-        render_results(all_doctors)
+        render_results(all_doctors, version)
  
 if __name__ == "__main__":
     main()
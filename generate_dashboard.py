@@ -1,8 +1,146 @@
+import gzip
+import hashlib
 import json
 import os
-from datetime import datetime
+import re
+import sys
+import time
+from core.database import atomic_write
+from core.slot_codec import to_local_iso
+from core.read_model import normalize_single_speciality
 
-def generate_dashboard():
+try:
+    import brotli  # Optional: additional .br chunks
+except ImportError:
+    brotli = None
+
+OUTPUT_HTML = "dashboard.html"
+# Index + chunks, fetched by the page on demand (next to dashboard.html)
+OUTPUT_DATA_DIR = "dashboard_data"
+# Doctors with the earliest slots, embedded in the index for the first paint
+PREVIEW_SIZE = 20
+# Incremental builds: per-doctor input hashes and rendered records of the last build.
+# Bump BUILD_VERSION whenever build_record() or the chunk layout changes.
+MANIFEST_FILE = "manifest.json"
+BUILD_VERSION = 1
+GEOHASH_PRECISION = 6
+GEOHASH_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def geohash_encode(lat, lon, precision=GEOHASH_PRECISION):
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, bit_count, even = [], 0, 0, True
+    while len(chars) < precision:
+        rng, value = (lon_range, lon) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        bits <<= 1
+        if value >= mid:
+            bits |= 1
+            rng[0] = mid
+        else:
+            rng[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(GEOHASH_BASE32[bits])
+            bits, bit_count = 0, 0
+    return "".join(chars)
+
+
+def slugify(text):
+    text = text.lower().replace("ä", "ae").replace("ö", "oe").replace("ü", "ue").replace("ß", "ss")
+    return re.sub(r"[^a-z0-9]+", "-", text).strip("-") or "sonstige"
+
+
+def doctor_specialities(doc):
+    raw = doc.get("speciality") or "Sonstige"
+    values = raw if isinstance(raw, list) else [s for s in str(raw).split(",")]
+    return list(dict.fromkeys(normalize_single_speciality(s.strip()) for s in values if str(s).strip())) or ["Sonstige"]
+
+
+def build_record(doc):
+    """What one card needs: no slot list, just the next slot (cards only show that)."""
+    # Scrapers store slots sorted (main.py keeps the first 50), so the first
+    # parseable one is the next slot. Slots may be epoch minutes (SLOT_FORMAT=minutes).
+    slots = doc.get("slots", [])
+    next_slot = next((s for s in map(to_local_iso, slots) if s), None)
+
+    lat, lon = doc.get("latitude"), doc.get("longitude")
+    speciality = doc.get("speciality")
+    return {
+        "id": doc.get("id"),
+        "name": doc.get("name", ""),
+        "speciality": ", ".join(speciality) if isinstance(speciality, list) else (speciality or ""),
+        "address": doc.get("address", ""),
+        "insurance": doc.get("insurance", []),
+        "booking_url": doc.get("booking_url"),
+        "next_slot": next_slot,
+        "slot_count": len(slots),
+        "lat": lat,
+        "lon": lon,
+        "gh": geohash_encode(lat, lon) if lat is not None and lon is not None else None,
+    }
+
+
+def by_next_slot(record):
+    # Doctors with slots first (earliest first), doctors without slots last
+    return (record["next_slot"] is None, record["next_slot"] or "", record["name"])
+
+
+def doctor_hash(doc):
+    return hashlib.sha1(json.dumps(doc, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def load_manifest(path):
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (json.JSONDecodeError, OSError):
+        return {}
+    # Records of another generator version can't be reused
+    return manifest if manifest.get("build_version") == BUILD_VERSION else {}
+
+
+def write_if_changed(path, payload):
+    """Writes bytes only when the file content differs; returns True if written."""
+    if os.path.exists(path) and os.path.getsize(path) == len(payload):
+        with open(path, "rb") as f:
+            if f.read() == payload:
+                return False
+    with atomic_write(path, "wb") as f:
+        f.write(payload)
+    return True
+
+
+def write_data_file(path, obj, force=False):
+    """
+    Writes JSON plus precompressed .gz (and .br with brotli) variants for static hosting,
+    skipping all of them when the JSON is unchanged (unless force). Returns (size, written).
+    """
+    payload = json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    if force:
+        with atomic_write(path, "wb") as f:
+            f.write(payload)
+    elif not write_if_changed(path, payload) and os.path.exists(path + ".gz"):
+        return len(payload), False
+    # mtime=0 keeps the .gz bytes stable for unchanged payloads
+    with atomic_write(path + ".gz", "wb") as f:
+        f.write(gzip.compress(payload, compresslevel=9, mtime=0))
+    if brotli is not None:
+        with atomic_write(path + ".br", "wb") as f:
+            f.write(brotli.compress(payload))
+    return len(payload), True
+
+
+def generate_dashboard(full=False):
+    """
+    Builds dashboard.html and dashboard_data/. Incremental by default: doctors whose
+    input hash is unchanged reuse their record from the manifest, chunks whose members
+    are unchanged are not re-serialized, and only files with new content are written.
+    """
+    started = time.perf_counter()
     # 1. Load Data
     data_path = os.path.join("data", "appointments.json")
     if not os.path.exists(data_path):
@@ -12,32 +150,73 @@ def generate_dashboard():
     with open(data_path, "r", encoding="utf-8") as f:
         doctors_data = json.load(f)
 
-    # 2. Prepare Data (Add Lat/Lon placeholders)
-    doctors_list = []
+    os.makedirs(os.path.join(OUTPUT_DATA_DIR, "chunks"), exist_ok=True)
+    manifest_path = os.path.join(OUTPUT_DATA_DIR, MANIFEST_FILE)
+    previous = {} if full else load_manifest(manifest_path).get("doctors", {})
+
+    # 2. Prepare Data: card records, one chunk per speciality, presorted by next slot
+    chunks = {}
+    records = []
+    manifest_doctors = {}
+    rebuilt = 0
     for doc_id, doc in doctors_data.items():
-        # Flatten slots to just the first one for sorting, or keep all?
-        # The prompt implies sorting doctors by "Next Appointment" or "Distance".
-        # So we need the *next* appointment for sorting.
-        
-        slots = doc.get("slots", [])
-        next_slot = None
-        if slots:
-            # Sort slots to find the earliest one
-            sorted_slots = sorted(slots)
-            next_slot = sorted_slots[0]
-        
-        # Add placeholder coordinates if missing
-        # In a real app, we would geocode 'doc["address"]' here.
-        if "lat" not in doc:
-            doc["lat"] = 0.0
-        if "lon" not in doc:
-            doc["lon"] = 0.0
-            
-        doc["next_slot"] = next_slot
-        doctors_list.append(doc)
+        digest = doctor_hash(doc)
+        cached = previous.get(doc_id)
+        if cached and cached["hash"] == digest:
+            record = cached["record"]
+        else:
+            record = build_record(doc)
+            rebuilt += 1
+        manifest_doctors[doc_id] = {"hash": digest, "record": record, "specialities": doctor_specialities(doc)}
+        records.append(record)
+        for speciality in manifest_doctors[doc_id]["specialities"]:
+            chunks.setdefault(speciality, []).append((doc_id, record))
 
-    # Serialize to JSON for embedding
-    doctors_json = json.dumps(doctors_list, ensure_ascii=False)
+    written = []
+    chunk_index = []
+    for speciality in sorted(chunks):
+        members = sorted(chunks[speciality], key=lambda m: by_next_slot(m[1]))
+        # Chunk name = hash of the build version and its members' input hashes: browsers
+        # may cache chunks forever, and unchanged chunks are neither serialized nor written
+        # again. Records are a function of (input, BUILD_VERSION), so the name changes
+        # whenever the content can.
+        digest = hashlib.sha1(
+            f"v{BUILD_VERSION}|".encode("utf-8")
+            + "|".join(f"{doc_id}:{manifest_doctors[doc_id]['hash']}" for doc_id, _ in members).encode("utf-8")
+        ).hexdigest()[:10]
+        file_name = f"chunks/{slugify(speciality)}.{digest}.json"
+        path = os.path.join(OUTPUT_DATA_DIR, file_name)
+        chunk_records = [record for _, record in members]
+        if not full and os.path.exists(path) and os.path.exists(path + ".gz"):
+            size = os.path.getsize(path)
+        else:
+            size, _ = write_data_file(path, {"speciality": speciality, "doctors": chunk_records}, force=full)
+            written.append(file_name)
+        chunk_index.append({
+            "speciality": speciality,
+            "file": file_name,
+            "count": len(chunk_records),
+            "with_slots": sum(1 for r in chunk_records if r["next_slot"]),
+            "bytes": size,
+            # Coarse regions (geohash-3, ~150 km) present in this chunk
+            "regions": sorted({r["gh"][:3] for r in chunk_records if r["gh"]}),
+        })
+
+    index = {
+        "chunks": chunk_index,
+        "preview": sorted(records, key=by_next_slot)[:PREVIEW_SIZE],
+    }
+    if write_data_file(os.path.join(OUTPUT_DATA_DIR, "index.json"), index, force=full)[1]:
+        written.append("index.json")
+
+    # Drop chunks of the previous build (their content hash changed)
+    current = {c["file"].split("/", 1)[1] for c in chunk_index}
+    chunk_dir = os.path.join(OUTPUT_DATA_DIR, "chunks")
+    removed = 0
+    for name in os.listdir(chunk_dir):
+        if name.split(".json", 1)[0] + ".json" not in current:
+            os.remove(os.path.join(chunk_dir, name))
+            removed += 1
 
     # 3. Generate HTML
     html_content = f"""
@@ -91,6 +270,13 @@ def generate_dashboard():
         button:hover {{
             opacity: 0.9;
         }}
+        select {{
+            padding: 10px 14px;
+            border-radius: 20px;
+            border: 1px solid #ccc;
+            font-size: 16px;
+            background: white;
+        }}
         #loading-spinner {{
             display: none;
             margin-left: 10px;
@@ -162,6 +348,11 @@ def generate_dashboard():
         <p>Finde deinen nächsten Arzttermin</p>
     </header>
 
+    <div class="controls">
+        <select id="speciality-select" onchange="selectSpeciality(this.value)">
+            <option value="">Alle Fachrichtungen (Vorschau)</option>
+        </select>
+    </div>
     <div class="controls">
         <button id="btn-time" class="active" onclick="sortByTime()">🕒 Nächster Termin</button>
         <button id="btn-dist" onclick="sortByDistance()">📍 Nächste Entfernung <span id="loading-spinner">⏳</span></button>
@@ -170,11 +361,18 @@ def generate_dashboard():
     <div id="doctor-list">
         <!-- Cards will be injected here -->
     </div>
+    <div id="list-info" class="doctor-meta" style="text-align:center;"></div>
 </div>
 
 <script>
-    // Embedded Data
-    let doctors = {doctors_json};
+    // Data is fetched on demand: a small index (with a preview of the earliest
+    // appointments) and one presorted chunk per speciality.
+    const DATA_DIR = '{OUTPUT_DATA_DIR}/';
+    const PREVIEW_INFO = 'Vorschau: die frühesten Termine aller Fachrichtungen';
+    const chunkCache = new Map();
+    let index = null;
+    let doctors = [];
+    let sortMode = 'time';
     let userLat = null;
     let userLon = null;
 
@@ -182,9 +380,81 @@ def generate_dashboard():
     const btnTime = document.getElementById('btn-time');
     const btnDist = document.getElementById('btn-dist');
     const spinner = document.getElementById('loading-spinner');
+    const selectEl = document.getElementById('speciality-select');
+    const infoEl = document.getElementById('list-info');
 
-    // Initial Render (Time Sorted)
-    sortByTime();
+    fetch(DATA_DIR + 'index.json')
+        .then(r => r.json())
+        .then(data => {{
+            index = data;
+            index.chunks.forEach(c => {{
+                const opt = document.createElement('option');
+                opt.value = c.file;
+                opt.textContent = `${{c.speciality}} (${{c.with_slots}})`;
+                selectEl.appendChild(opt);
+            }});
+            showDoctors(index.preview, PREVIEW_INFO);
+        }});
+
+    function loadChunk(file) {{
+        if (chunkCache.has(file)) return Promise.resolve(chunkCache.get(file));
+        return fetch(DATA_DIR + file)
+            .then(r => r.json())
+            .then(chunk => {{
+                chunkCache.set(file, chunk.doctors);
+                return chunk.doctors;
+            }});
+    }}
+
+    function loadAllDoctors() {{
+        // The preview only holds the earliest doctors, so the nearest one needs every chunk.
+        // Doctors with several specialities are in several chunks: keep one card each.
+        return Promise.all(index.chunks.map(c => loadChunk(c.file))).then(lists => {{
+            const byId = new Map();
+            lists.flat().forEach(doc => {{ if (!byId.has(doc.id)) byId.set(doc.id, doc); }});
+            // Same order as the generator's chunks: with slots first, earliest first
+            return [...byId.values()].sort((a, b) =>
+                (a.next_slot === null) - (b.next_slot === null)
+                || (a.next_slot || '').localeCompare(b.next_slot || '')
+                || a.name.localeCompare(b.name));
+        }});
+    }}
+
+    function showOverview() {{
+        if (sortMode === 'distance' && userLat && userLon) {{
+            infoEl.textContent = 'Lade…';
+            loadAllDoctors().then(all => {{
+                if (!selectEl.value) showDoctors(all, `Alle Fachrichtungen (${{all.length}})`);
+            }});
+        }} else {{
+            showDoctors(index.preview, PREVIEW_INFO);
+        }}
+    }}
+
+    function selectSpeciality(file) {{
+        if (!file) {{
+            showOverview();
+            return;
+        }}
+        if (!chunkCache.has(file)) infoEl.textContent = 'Lade…';
+        loadChunk(file).then(docs => {{
+            if (selectEl.value === file) showDoctors(docs, '');
+        }});
+    }}
+
+    function showByDistance() {{
+        // The overview holds only the preview until every chunk is loaded
+        if (!selectEl.value) showOverview();
+        else applyDistanceSort();
+    }}
+
+    function showDoctors(docs, info) {{
+        // Chunks arrive presorted by next appointment
+        doctors = docs;
+        infoEl.textContent = info;
+        if (sortMode === 'distance' && userLat && userLon) applyDistanceSort();
+        else sortByTime();
+    }}
 
     function renderList(docs) {{
         listEl.innerHTML = '';
@@ -224,22 +494,18 @@ def generate_dashboard():
 
     function sortByTime() {{
         setActive(btnTime);
-        // Sort: Docs with slots first, then by date. Docs without slots last.
-        const sorted = [...doctors].sort((a, b) => {{
-            if (!a.next_slot && !b.next_slot) return 0;
-            if (!a.next_slot) return 1;
-            if (!b.next_slot) return -1;
-            return new Date(a.next_slot) - new Date(b.next_slot);
-        }});
-        renderList(sorted);
+        sortMode = 'time';
+        // Presorted by the generator: docs with slots first, earliest first
+        renderList(doctors);
     }}
 
     function sortByDistance() {{
         setActive(btnDist);
+        sortMode = 'distance';
         
         if (userLat && userLon) {{
             // Already have location, just sort
-            applyDistanceSort();
+            showByDistance();
         }} else {{
             // Request Location
             spinner.style.display = 'inline';
@@ -255,7 +521,7 @@ def generate_dashboard():
                     userLat = position.coords.latitude;
                     userLon = position.coords.longitude;
                     spinner.style.display = 'none';
-                    applyDistanceSort();
+                    showByDistance();
                 }},
                 (error) => {{
                     console.error("Error getting location:", error);
@@ -268,15 +534,16 @@ def generate_dashboard():
     }}
 
     function applyDistanceSort() {{
-        // Calculate distances
+        // Calculate distances (doctors without coordinates go last)
         doctors.forEach(doc => {{
-            // Use placeholder 0,0 if missing, but ideally we need real coords
-            // If doc.lat is 0, distance will be huge/wrong, but code won't crash.
-            doc.distance = getDistanceFromLatLonInKm(userLat, userLon, doc.lat, doc.lon);
+            doc.distance = (doc.lat === null || doc.lon === null)
+                ? null
+                : getDistanceFromLatLonInKm(userLat, userLon, doc.lat, doc.lon);
         }});
 
         // Sort by distance
-        const sorted = [...doctors].sort((a, b) => a.distance - b.distance);
+        const far = Number.POSITIVE_INFINITY;
+        const sorted = [...doctors].sort((a, b) => (a.distance ?? far) - (b.distance ?? far));
         renderList(sorted);
     }}
 
@@ -308,11 +575,23 @@ def generate_dashboard():
 </html>
     """
 
-    # 4. Write Output
-    with open("dashboard.html", "w", encoding="utf-8") as f:
-        f.write(html_content)
-    
-    print("✅ dashboard.html generated successfully!")
+    # 4. Write Output (only changed files; the manifest describes the whole build)
+    if write_if_changed(OUTPUT_HTML, html_content.encode("utf-8")):
+        written.append(OUTPUT_HTML)
+
+    manifest = {
+        "build_version": BUILD_VERSION,
+        "files": ["index.json"] + [c["file"] for c in chunk_index],
+        "doctors": manifest_doctors,
+    }
+    write_if_changed(manifest_path, json.dumps(manifest, ensure_ascii=False, indent=1).encode("utf-8"))
+
+    elapsed = (time.perf_counter() - started) * 1000
+    print(f"✅ {OUTPUT_HTML} generated successfully! {len(doctors_data)} doctors ({rebuilt} rebuilt), "
+          f"{len(chunk_index)} chunks, {len(written)} files written, {removed} removed in {elapsed:.0f} ms")
+    for name in written:
+        print(f"   wrote {name}")
 
 if __name__ == "__main__":
-    generate_dashboard()
+    # python generate_dashboard.py [--full]   (--full ignores the manifest)
+    generate_dashboard(full="--full" in sys.argv[1:])
@@ -2,9 +2,17 @@ import asyncio
 import json
 import os
 import glob
-from core.database import DBManager
+from core.database import create_db_manager
+from core.slot_history import SlotHistoryStore
+from core.read_model import consolidate_data, write_read_model
+from core.snapshot import write_snapshot
+from core.geocoder import GeocodingService
+from core.scheduler import ScraperScheduler
+from core.slot_budget import SlotBudget
+from core.browser_pool import BrowserPool
+from core.http_client import create_http_session
 from scrapers.custom_palasser import CustomPalasserScraper
-from scrapers.medineum import MedineumScraper
+from scrapers.medineum import MedineumScraper, MedineumInstitutionScraper, group_by_institution
 from scrapers.kutschera import KutscheraScraper
 from scrapers.latido import LatidoScraper
 from scrapers.custom_aichinger import CustomAichingerScraper
@@ -15,6 +23,13 @@ from scrapers.timesloth import TimeslothScraper
 from scrapers.mobimed import MobimedScraper
 from scrapers.timify import TimifyScraper
 
+# Anzahl Upserts, nach denen appointments.json zwischengespeichert wird
+DB_CHECKPOINT_EVERY = 25
+
+# Slot-Budget pro Arzt: mehr Slots werden nicht gespeichert, also auch nicht abgefragt
+MAX_SLOTS_PER_DOCTOR = 50
+SLOT_HORIZON_DAYS = 365
+
 # Factory Map: Mapping von String-Typ zu Klasse
 SCRAPER_MAP = {
     "latido": LatidoScraper, # Generic Latido
@@ -87,6 +102,32 @@ def load_all_registries():
 
     return combined_registry
 
+async def geocode_unknown(doctors, coords_by_address, geocoder):
+    """
+    Geocodes addresses that were not in the registry (e.g. generated Perfect Smile entries);
+    cached after the first run. Nominatim and its 1 s rate limit block, so they run in a
+    worker thread instead of stalling the running scrapers.
+    """
+    for doctor in doctors:
+        if doctor.latitude is None and doctor.address not in coords_by_address:
+            coords_by_address[doctor.address] = await asyncio.to_thread(geocoder.geocode_address, doctor.address)
+
+
+def store_results(batch, doctors, history=None, coords_by_address=None, covered_until=None):
+    """Writer stage: adds the Doctor objects of one finished scraper to the DB batch."""
+    for doctor in doctors:
+        if coords_by_address is not None and doctor.latitude is None:
+            coords = coords_by_address.get(doctor.address)
+            if coords:
+                doctor.latitude, doctor.longitude = coords
+        if history is not None:
+            # History sees every slot the scraper fetched, but only closes slots up to how far it looked
+            history.observe(doctor.id, doctor.speciality, doctor.slot_minutes(), covered_until=covered_until)
+        # Limit to 50 slots per doctor as requested
+        if len(doctor.slots) > MAX_SLOTS_PER_DOCTOR:
+            doctor.slots = doctor.slots[:MAX_SLOTS_PER_DOCTOR]
+        batch.upsert(doctor)
+
 async def main():
     registry = load_all_registries()
     
@@ -94,47 +135,78 @@ async def main():
         print("❌ No doctors found in registry!")
         return
     print("--- Starting Med-Aggregator (Registry Mode) ---")
-    db_manager = DBManager()
+    db_manager = create_db_manager()
     
     print(f"Loaded {len(registry)} doctors from registry.")
     
-    # Cleanup stale entries
-    active_ids = [doc.get("id") for doc in registry if "id" in doc]
-    db_manager.remove_stale_doctors(active_ids)
+    # Geocoding: every distinct registry address once; re-runs only hit new/changed addresses
+    geocoder = GeocodingService()
+    coords_by_address = geocoder.geocode_batch(doc.get("address") for doc in registry)
     
-    scraper_instances = []
+    scheduler = ScraperScheduler()
+    # Ein Browser-Pool für alle Playwright-Scraper dieses Runs (Browser starten lazy)
+    browser_pool = BrowserPool()
+    # Eine aiohttp-Session (Keep-Alive, Connection-Pool pro Host) für alle HTTP-Scraper
+    http_session = create_http_session()
+    
+    # Medineum: ein Scraper pro Institution (ein Token, ein Batch-Fetch für alle Terminarten)
+    medineum_configs = [d for d in registry if d.get("scraper_type") == "medineum"]
+    for institution_configs in group_by_institution(medineum_configs):
+        scraper = MedineumInstitutionScraper(institution_configs, browser_pool=browser_pool, http_session=http_session,
+                                             budget=SlotBudget(MAX_SLOTS_PER_DOCTOR, SLOT_HORIZON_DAYS))
+        scheduler.add(scraper, "medineum")
     
     for doctor_config in registry:
         scraper_type = doctor_config.get("scraper_type")
         
-        if scraper_type in SCRAPER_MAP:
+        if scraper_type == "medineum":
+            continue
+        elif scraper_type in SCRAPER_MAP:
             scraper_class = SCRAPER_MAP[scraper_type]
             # Instanziiere Scraper mit der Config
-            scraper_instances.append(scraper_class(doctor_config))
+            scraper = scraper_class(doctor_config, browser_pool=browser_pool, http_session=http_session,
+                                    budget=SlotBudget(MAX_SLOTS_PER_DOCTOR, SLOT_HORIZON_DAYS))
+            scheduler.add(scraper, scraper_type)
         else:
             print(f"Warning: Unknown scraper type '{scraper_type}' for doctor {doctor_config.get('name')}")
 
-    if not scraper_instances:
+    if not scheduler.jobs:
         print("No valid scrapers initialized.")
+        await http_session.close()
         return
 
-    # Run all scrapers in parallel
-    print(f"Running {len(scraper_instances)} scrapers...")
+    # Run scrapers in parallel, bounded per scraper type / host / globally
+    print(f"Running {len(scheduler.jobs)} scrapers (max {scheduler.global_limit} concurrent)...")
     
-    tasks = [scraper.scrape() for scraper in scraper_instances]
-    results = await asyncio.gather(*tasks, return_exceptions=True)
+    # Streaming: results go into one DB batch as soon as their scraper finishes.
+    # The batch checkpoints periodically (atomic rename), so a crash late in the
+    # run keeps earlier results, and stale doctors are dropped in the same pass.
+    active_ids = [doc.get("id") for doc in registry if "id" in doc]
+    history = SlotHistoryStore(db_manager.data_dir)
+    try:
+        with db_manager.batch(checkpoint_every=DB_CHECKPOINT_EVERY) as batch:
+            batch.remove_stale(active_ids)
+            async for job, result in scheduler.stream():
+                if isinstance(result, Exception):
+                    print(f"Scraper {job.scraper_type} failed with error: {result}")
+                elif result:
+                    # A failed scrape returns an incomplete slot list; history would count it as bookings
+                    observed = None if job.scraper.failed else history
+                    await geocode_unknown(result, coords_by_address, geocoder)
+                    store_results(batch, result, observed, coords_by_address,
+                                  covered_until=job.scraper.budget.fetched_until)
+    finally:
+        await browser_pool.close()
+        await http_session.close()
+        history.flush()
+    scheduler.report()
     
-    # Process results
-    for result in results:
-        if isinstance(result, Exception):
-            print(f"Scraper failed with error: {result}")
-        elif result:
-            # Result is a list of Doctor objects
-            for doctor in result:
-                # Limit to 50 slots per doctor as requested
-                if len(doctor.slots) > 50:
-                    doctor.slots = doctor.slots[:50]
-                db_manager.save_doctor(doctor)
+    # Dashboard-ready read model (groups, parsed/sorted slots), consolidated once
+    # and written both as JSON and as the mmap-able binary snapshot
+    data = db_manager.load_data()
+    doctors = consolidate_data(data)
+    write_read_model(data, db_manager.data_dir, doctors=doctors)
+    write_snapshot(doctors, db_manager.data_dir)
                 
     print("--- Aggregation Finished ---")
 
@@ -1,18 +1,192 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import List
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Iterable, Iterator, List, Optional, Sized, Tuple
+from urllib.parse import urlparse
 from core.models import Doctor
+from core.slot_budget import SlotBudget
+
+
+def date_windows(start: datetime, end: datetime, days: int) -> Iterator[Tuple[datetime, datetime]]:
+    """Zerlegt [start, end) in aufeinanderfolgende Zeitfenster von höchstens `days` Tagen."""
+    current = start
+    while current < end:
+        window_end = min(current + timedelta(days=days), end)
+        yield current, window_end
+        current = window_end
+
 
 class BaseScraper(ABC):
-    def __init__(self, doctor_config: dict):
+    # API-Host der Plattform (für Concurrency-Limits pro Host im Scheduler).
+    # Wenn None, wird der Host aus 'url' bzw. 'booking_url' der Config abgeleitet.
+    HOST: Optional[str] = None
+
+    # Wie viele Zeitfenster ein Job gleichzeitig abfragen darf (fetch_windows).
+    # Pro Host also höchstens Host-Limit des Schedulers x WINDOW_CONCURRENCY Requests.
+    WINDOW_CONCURRENCY: int = 1
+
+    def __init__(self, doctor_config: dict, browser_pool=None, http_session=None, budget=None):
         """
         Initialisiert den Scraper mit der Konfiguration für einen spezifischen Arzt.
         :param doctor_config: Ein Dictionary mit Schlüsseln wie 'id', 'name', 'url', etc.
+        :param browser_pool: Optionaler run-weiter BrowserPool (core.browser_pool).
+        :param http_session: Optionale run-weite aiohttp-Session (core.http_client).
+        :param budget: Optionales SlotBudget (max. Slots + Horizont); Scraper hören auf,
+                       weitere Fenster/Seiten/Wochen abzufragen, sobald es erfüllt ist.
         """
         self.config = doctor_config
+        self.browser_pool = browser_pool
+        self.http_session = http_session
+        self.budget = budget if budget is not None else SlotBudget()
+        # Von Scrapern bei Fehlern gesetzt: die Slot-Liste ist dann unvollständig
+        self.failed = False
         self.doctor_id = doctor_config.get('id')
         self.doctor_name = doctor_config.get('name')
         self.url = doctor_config.get('url')
 
+    @property
+    def host(self) -> Optional[str]:
+        if self.HOST:
+            return self.HOST
+        url = self.config.get('url') or self.config.get('booking_url')
+        if not url:
+            return None
+        return urlparse(url).netloc or None
+
+    @asynccontextmanager
+    async def browser_context(self, **context_kwargs):
+        """
+        Liefert einen isolierten Playwright-BrowserContext.
+        Mit Pool wird ein Context geleast, sonst ein eigener Browser gestartet.
+        """
+        if self.browser_pool is not None:
+            async with self.browser_pool.context(**context_kwargs) as context:
+                yield context
+        else:
+            from core.browser_pool import standalone_context
+            async with standalone_context(**context_kwargs) as context:
+                yield context
+
+    @asynccontextmanager
+    async def http(self):
+        """
+        Liefert die aiohttp-Session des Runs, oder eine eigene für Einzelaufrufe.
+        """
+        if self.http_session is not None:
+            yield self.http_session
+        else:
+            from core.http_client import standalone_session
+            async with standalone_session() as session:
+                yield session
+
+    @asynccontextmanager
+    async def cookie_http(self):
+        """
+        Liefert eine aiohttp-Session mit eigenem Cookie-Jar (z.B. für PHP-Sessions),
+        die den Connection-Pool der Run-Session mitbenutzt.
+        """
+        from core.http_client import cookie_session
+        async with cookie_session(self.http_session) as session:
+            yield session
+
+    async def fetch_windows(self,
+                            windows: Iterable,
+                            fetch_window: Callable[[Any], Awaitable[Optional[list]]],
+                            key: Optional[Callable[[Any], Any]] = None,
+                            satisfied: Optional[Callable[[list], bool]] = None,
+                            concurrency: Optional[int] = None,
+                            delay: float = 0.0,
+                            planned: Optional[int] = None,
+                            window_end: Optional[Callable[[Any], datetime]] = None) -> list:
+        """
+        Fragt Zeitfenster (Datumsbereiche, Tage, Seiten, ...) ab und führt die Ergebnisse zusammen.
+        :param windows: Die Fenster in zeitlicher Reihenfolge; wird lazy gelesen, ein Generator
+                        kann also vom Ergebnis des vorherigen Fensters abhängen (concurrency=1).
+        :param fetch_window: async fn(window) -> Liste der Einträge dieses Fensters,
+                             oder None, wenn das Fenster fehlgeschlagen ist (setzt self.failed).
+        :param key: Schlüssel für die Deduplizierung (Standard: der Eintrag selbst).
+        :param satisfied: fn(bisherige Einträge) -> True, wenn keine weiteren Fenster nötig sind
+                          (Standard: das SlotBudget des Scrapers).
+        :param concurrency: Gleichzeitige Fenster (Standard: WINDOW_CONCURRENCY).
+        :param delay: Pause nach jedem Fenster, bevor dessen Platz frei wird.
+        :param planned: Geplante Anzahl Fenster, falls `windows` keine len() hat (nur für
+                        die Budget-Statistik; der Iterator wird nie zu Ende gelesen).
+        :param window_end: fn(window) -> Ende des Fensters (naive Wiener Zeit); damit wird
+                           budget.covered_until über den lückenlos erfolgreichen Anfang fortgeschrieben.
+        :return: Deduplizierte Einträge in Fenster-Reihenfolge.
+
+        Zusammengeführt wird immer nur der lückenlose Anfang der Fenster, damit ein
+        frühes Abbrechen nie die nächsten Termine verliert. Sobald `satisfied` erfüllt
+        ist, werden laufende Fenster abgebrochen und keine neuen mehr gestartet.
+        """
+        concurrency = max(1, concurrency or self.WINDOW_CONCURRENCY)
+        if satisfied is None:
+            satisfied = self.budget.satisfied
+
+        async def run(window):
+            try:
+                return await fetch_window(window)
+            finally:
+                if delay:
+                    await asyncio.sleep(delay)
+
+        if planned is None and isinstance(windows, Sized):
+            planned = len(windows)
+        remaining = iter(windows)
+        started = {}   # Fenster-Index -> Fenster (für window_end)
+        pending = {}   # Fenster-Index -> Task
+        finished = {}  # Fenster-Index -> Einträge, noch nicht zusammengeführt
+        merged, seen = [], set()
+        launched = merge_index = 0
+        exhausted = stopped = window_failed = False
+        try:
+            while True:
+                while not exhausted and len(pending) < concurrency:
+                    window = next(remaining, StopIteration)
+                    if window is StopIteration:
+                        exhausted = True
+                        break
+                    self.budget.request()
+                    started[launched] = window
+                    pending[launched] = asyncio.ensure_future(run(window))
+                    launched += 1
+                if not pending:
+                    break
+
+                done, _ = await asyncio.wait(pending.values(), return_when=asyncio.FIRST_COMPLETED)
+                for index in [i for i, task in pending.items() if task in done]:
+                    finished[index] = pending.pop(index).result()
+                while merge_index in finished:
+                    items = finished.pop(merge_index)
+                    window = started.pop(merge_index)
+                    if items is None:
+                        # Fehlgeschlagen: der Verlauf darf nichts ab hier als geschlossen werten
+                        self.failed = window_failed = True
+                    elif window_end is not None and not window_failed:
+                        self.budget.cover(window_end(window))
+                    for item in items or []:
+                        item_key = item if key is None else key(item)
+                        if item_key not in seen:
+                            seen.add(item_key)
+                            merged.append(item)
+                    merge_index += 1
+
+                if satisfied(merged):
+                    stopped = True
+                    break
+        finally:
+            for task in pending.values():
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending.values(), return_exceptions=True)
+
+        if stopped:
+            # Gespart sind nur nie gestartete Fenster (abgebrochene laufende wurden schon angefragt);
+            # deren Anzahl ist nur bekannt, wenn `planned` bekannt ist
+            self.budget.skip(planned - launched if planned is not None else 0)
+        return merged
+
     @abstractmethod
     async def scrape(self) -> List[Doctor]:
         """
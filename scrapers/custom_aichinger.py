@@ -1,11 +1,12 @@
-import requests
-import asyncio
+import json
 from typing import List
 from core.models import Doctor
 from .base import BaseScraper
 from datetime import datetime, timedelta
 
 class CustomAichingerScraper(BaseScraper):
+    HOST = "www.wisitor.at"
+
     async def scrape(self) -> List[Doctor]:
         print(f"[Aichinger] Scraping {self.doctor_name}...")
         
@@ -25,7 +26,6 @@ class CustomAichingerScraper(BaseScraper):
         }
         
         slots = []
-        loop = asyncio.get_event_loop()
         
         try:
             # 1. Fetch available days (freieTage.php)
@@ -53,11 +53,14 @@ class CustomAichingerScraper(BaseScraper):
             
             print(f"[Aichinger] Fetching days from {days_url} with params {days_params}")
             
-            response = await loop.run_in_executor(None, lambda: requests.get(days_url, params=days_params, headers=headers))
+            async with self.http() as session:
+                async with session.get(days_url, params=days_params, headers=headers) as response:
+                    status = response.status
+                    body = await response.text()
             
-            if response.status_code == 200:
+            if status == 200:
                 try:
-                    data = response.json()
+                    data = json.loads(body)
                     # Data structure expected: [{"YYYY-MM-DD": {...}, ...}] or similar
                     # Response might be [null, null] if no days found
                     
@@ -94,13 +97,16 @@ class CustomAichingerScraper(BaseScraper):
                             print("[Aichinger] No available days found (data[0] is null).")
                                     
                 except Exception as json_err:
-                     print(f"[Aichinger] JSON Error: {json_err} - Response: {response.text[:100]}")
+                     print(f"[Aichinger] JSON Error: {json_err} - Response: {body[:100]}")
+                     self.failed = True
 
             else:
-                print(f"[Aichinger] Failed to fetch days: {response.status_code}")
+                print(f"[Aichinger] Failed to fetch days: {status}")
+                self.failed = True
                 
         except Exception as e:
             print(f"[Aichinger] Error: {e}")
+            self.failed = True
             
         doctor = Doctor(
             id=self.doctor_id,
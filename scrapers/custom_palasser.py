@@ -1,11 +1,12 @@
-import requests
-import asyncio
+import json
 from typing import List
 from core.models import Doctor
 from .base import BaseScraper
 from datetime import datetime, timedelta
 
 class CustomPalasserScraper(BaseScraper):
+    HOST = "www.wisitor.at"
+
     async def scrape(self) -> List[Doctor]:
         print(f"[Palasser] Scraping {self.doctor_name}...")
         
@@ -30,13 +31,15 @@ class CustomPalasserScraper(BaseScraper):
         }
         
         slots = []
-        loop = asyncio.get_event_loop()
         
         try:
-            response = await loop.run_in_executor(None, lambda: requests.get(url, headers=headers))
+            async with self.http() as session:
+                async with session.get(url, headers=headers) as response:
+                    status = response.status
+                    body = await response.text()
             
-            if response.status_code == 200:
-                data = response.json()
+            if status == 200:
+                data = json.loads(body)
                 if data and isinstance(data, list) and len(data) > 0:
                     tage_dict = data[0]
                     
@@ -69,10 +72,12 @@ class CustomPalasserScraper(BaseScraper):
                                 
                         except Exception as day_err:
                             print(f"[Palasser] Error processing day {datum}: {day_err}")
+                            self.failed = True
 
                             
         except Exception as e:
             print(f"[Palasser] Error: {e}")
+            self.failed = True
             
         doctor = Doctor(
             id=self.doctor_id,
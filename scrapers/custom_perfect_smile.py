@@ -5,9 +5,10 @@ from typing import List
 from datetime import datetime
 from core.models import Doctor
 from .base import BaseScraper
-from playwright.async_api import async_playwright
 
 class CustomPerfectSmileScraper(BaseScraper):
+    HOST = "termine.softdent.at"
+
     async def scrape(self) -> List[Doctor]:
         print(f"[Perfect Smile] Scraping {self.doctor_name} (Deep Scan V2 - UI Interaction)...")
         
@@ -25,12 +26,10 @@ class CustomPerfectSmileScraper(BaseScraper):
         
         generated_doctors = []
         
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            context = await browser.new_context(
-                user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-                viewport={"width": 1280, "height": 720}
-            )
+        async with self.browser_context(
+            user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+            viewport={"width": 1280, "height": 720}
+        ) as context:
             
             for loc in LOCATIONS:
                 for service in loc["services"]:
@@ -153,6 +152,7 @@ class CustomPerfectSmileScraper(BaseScraper):
                                 
                     except Exception as e:
                         print(f"    [Error] {display_name}: {e}")
+                        self.failed = True
                     finally:
                         await page.close()
                     
@@ -171,7 +171,5 @@ class CustomPerfectSmileScraper(BaseScraper):
                         booking_url="https://perfect-smile.at/online-terminvereinbarung/"
                     )
                     generated_doctors.append(doc)
-
-            await browser.close()
             
         return generated_doctors
@@ -2,7 +2,6 @@ import asyncio
 from typing import List
 from core.models import Doctor
 from .base import BaseScraper
-from playwright.async_api import async_playwright
 
 class DoctenaScraper(BaseScraper):
     async def scrape(self) -> List[Doctor]:
@@ -12,9 +11,8 @@ class DoctenaScraper(BaseScraper):
         slots = []
         
         try:
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(headless=True)
-                page = await browser.new_page()
+            async with self.browser_context() as context:
+                page = await context.new_page()
                 
                 try:
                     await page.goto(url, wait_until="networkidle", timeout=30000)
@@ -26,7 +24,6 @@ class DoctenaScraper(BaseScraper):
                         text = await alert.inner_text()
                         if "nicht möglich" in text:
                             print(f"[Doctena] Online booking not possible for {self.doctor_name}")
-                            await browser.close()
                             return [self._create_doctor(slots)]
 
                     # If no alert, try to find slots
@@ -39,11 +36,11 @@ class DoctenaScraper(BaseScraper):
                         
                 except Exception as e:
                     print(f"[Doctena] Page load error: {e}")
-                
-                await browser.close()
+                    self.failed = True
                     
         except Exception as e:
             print(f"[Doctena] Error: {e}")
+            self.failed = True
             
         print(f"[Doctena] Found {len(slots)} slots.")
         return [self._create_doctor(slots)]
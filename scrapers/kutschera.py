@@ -1,146 +1,105 @@
-import asyncio
 import json
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import List
+from lxml import html as lxml_html
+from yarl import URL
+from lxml.etree import ParserError
 from core.models import Doctor
 from .base import BaseScraper
-from playwright.async_api import async_playwright
-from bs4 import BeautifulSoup
+
+BASE_URL = "https://termin.kutschera.co.at/bootstrap/php"
+URL_URLAUB = f"{BASE_URL}/get_urlaub.php"
+URL_TERMINE = f"{BASE_URL}/get_termine.php"
+URL_DETAILS = f"{BASE_URL}/wochentag.php"
+# Landing page that starts the PHP session
+DEFAULT_START_URL = "https://termin.kutschera.co.at/eckhardtm/"
+
+# Stop after this many days with free slots
+MAX_DAYS_WITH_SLOTS = 10
+# Concurrent day-detail POSTs per doctor in HTTP mode (the connector caps per host anyway)
+HTTP_DAY_CONCURRENCY = 6
+
+MODE_HTTP = "http"
+MODE_BROWSER = "browser"
+MODES = (MODE_HTTP, MODE_BROWSER)
+
+BROWSER_POST_JS = """
+    async ({url, data}) => {
+        const formData = new FormData();
+        for (const k in data) {
+            formData.append(k, data[k]);
+        }
+        const response = await fetch(url, {
+            method: 'POST',
+            body: formData
+        });
+        return await response.text();
+    }
+"""
+
+
+def _parse_day(datum_str: str, detail_text: str) -> List[str]:
+    """ISO slots of one wochentag.php fragment (bookable buttons and div.aviable)."""
+    if not detail_text or not detail_text.strip():
+        return []
+    try:
+        root = lxml_html.fromstring(detail_text)
+    except ParserError:
+        return []
+
+    found_slots_in_day = []
+    # Bookable buttons
+    for btn in root.xpath("//button[contains(@onclick, 'buchen')]"):
+        found_slots_in_day.append(btn.text_content().strip())
+    # Also check for div.aviable (typo in website); text might be "10:00 bis 10:30"
+    for div in root.xpath("//div[contains(concat(' ', normalize-space(@class), ' '), ' aviable ')]"):
+        found_slots_in_day.append(div.text_content().strip().split(" bis ")[0].strip())
+
+    day_slots = []
+    for time_str in found_slots_in_day:
+        # Clean up time string (sometimes it has extra chars)
+        time_str = time_str.split(" ")[0]
+        try:
+            day_slots.append(datetime.strptime(f"{datum_str} {time_str}", "%Y-%m-%d %H:%M").isoformat())
+        except ValueError:
+            pass
+    return day_slots
+
 
 class KutscheraScraper(BaseScraper):
+    """
+    Kutschera booking pages. By default ("mode": "http") the PHP session comes from a
+    plain cookie-aware aiohttp session and day details are fetched concurrently;
+    "mode": "browser" keeps the old Playwright path (fetch from inside the page),
+    which is also the fallback if the HTTP session cannot be established.
+    """
+    HOST = "termin.kutschera.co.at"
+    # Day details are independent; in browser mode they run as concurrent fetches in the one page
+    WINDOW_CONCURRENCY = 3
+
     async def scrape(self) -> List[Doctor]:
         print(f"[Kutschera] Scraping {self.doctor_name}...")
-        
-        base_url = "https://termin.kutschera.co.at/bootstrap/php"
-        url_urlaub = f"{base_url}/get_urlaub.php"
-        url_termine = f"{base_url}/get_termine.php"
-        url_details = f"{base_url}/wochentag.php"
-        
-        kunden_id = self.config.get("kunden_id", 385)
-        blockzeit = self.config.get("blockzeit", 30)
-        
+
         slots = []
-        
+        mode = self.config.get("mode", MODE_HTTP)
+        if mode not in MODES:
+            print(f"[Kutschera] Unknown mode '{mode}' for {self.doctor_name}, using '{MODE_HTTP}'.")
+            mode = MODE_HTTP
+
         try:
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(headless=True)
-                context = await browser.new_context(
-                    user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
-                )
-                page = await context.new_page()
-                
-                # Visit main page first to get cookies/session
-                await page.goto("https://termin.kutschera.co.at/eckhardtm/", wait_until="domcontentloaded")
-                
-                # Helper to make requests with correct headers
-                async def post_request(url, data):
-                    # Use page.evaluate to ensure we use the same fetch context as the page
-                    # This is more robust than context.request.post for some PHP sessions
-                    return await page.evaluate("""
-                        async ({url, data}) => {
-                            const formData = new FormData();
-                            for (const k in data) {
-                                formData.append(k, data[k]);
-                            }
-                            const response = await fetch(url, {
-                                method: 'POST',
-                                body: formData
-                            });
-                            return await response.text();
-                        }
-                    """, {"url": url, "data": data})
-
-                heute = datetime.now()
-                ende = heute + timedelta(days=180)
-                datum_start = heute.strftime("%Y-%m-%d")
-                datum_ende = ende.strftime("%Y-%m-%d")
-                
-                # 1. Urlaub
-                urlaub_text = await post_request(url_urlaub, {
-                    'kunden_id': kunden_id, 'datum_start': datum_start, 'datum_ende': datum_ende
-                })
+            if mode == MODE_HTTP:
                 try:
-                    urlaub_set = set(json.loads(urlaub_text))
-                except:
-                    print(f"[Kutschera] Failed to parse Urlaub. Text: {urlaub_text[:100]}")
-                    urlaub_set = set()
-                
-                # 2. Termine
-                termine_text = await post_request(url_termine, {
-                    'kunden_id': kunden_id, 'datum_start': datum_start, 'datum_ende': datum_ende, 'blockzeit': blockzeit
-                })
-                
-                try:
-                    termine_data = json.loads(termine_text)
-                    print(f"[Kutschera] Got {len(termine_data)} entries.")
-                except:
-                    print(f"[Kutschera] Failed to parse Termine. Text: {termine_text[:100]}")
-                    termine_data = []
-                
-                found_count = 0
-                
-                for eintrag in termine_data:
-                    if found_count >= 10: break
-                    
-                    if isinstance(eintrag, list): datum_str = eintrag[0]
-                    elif isinstance(eintrag, dict): datum_str = eintrag.get('datum', '')
-                    else: datum_str = str(eintrag)
-                    
-                    if datum_str in urlaub_set: continue
-                    
-                    try:
-                        d_obj = datetime.strptime(datum_str, "%Y-%m-%d")
-                        js_wochentag = (d_obj.weekday() + 1) % 7
-                        
-                        detail_text = await post_request(url_details, {
-                            'kunden_id': kunden_id, 'wochentag': js_wochentag, 'blockzeit': blockzeit, 'datum': datum_str
-                        })
-                        
-                        soup = BeautifulSoup(detail_text, 'html.parser')
-                        
-                        buchbare_buttons = soup.find_all("button", onclick=True)
-                        echte_slots = [b for b in buchbare_buttons if "buchen" in b['onclick']]
-                        
-                        # Also check for div.aviable (typo in website)
-                        freie_divs = soup.find_all("div", class_="aviable")
-                        
-                        found_slots_in_day = []
-                        
-                        # Process buttons
-                        for btn in echte_slots:
-                            found_slots_in_day.append(btn.text.strip())
-                            
-                        # Process divs
-                        for div in freie_divs:
-                            # Text might be "10:00 bis 10:30"
-                            txt = div.text.strip()
-                            # Extract start time
-                            parts = txt.split(" bis ")
-                            if parts:
-                                found_slots_in_day.append(parts[0].strip())
-                        
-                        if found_slots_in_day:
-                            for time_str in found_slots_in_day:
-                                # Clean up time string (sometimes it has extra chars)
-                                time_str = time_str.split(" ")[0]
-                                try:
-                                    t_obj = datetime.strptime(f"{datum_str} {time_str}", "%Y-%m-%d %H:%M")
-                                    slots.append(t_obj.isoformat())
-                                except:
-                                    # Try just appending date if time parse fails
-                                    pass
-                            
-                            found_count += 1
-                        
-                        await asyncio.sleep(0.1)
-                        
-                    except Exception:
-                        continue
-                
-                await browser.close()
-                    
+                    slots = await self._scrape_http()
+                except Exception as e:
+                    print(f"[Kutschera] HTTP mode failed ({e}), falling back to browser.")
+                    self.failed = False
+                    self.budget.reset()
+                    mode = MODE_BROWSER
+            if mode == MODE_BROWSER:
+                slots = await self._scrape_browser()
         except Exception as e:
             print(f"[Kutschera] Error: {e}")
+            self.failed = True
 
         doctor = Doctor(
             id=self.doctor_id,
@@ -151,5 +110,119 @@ class KutscheraScraper(BaseScraper):
             slots=sorted(list(slots)),
             booking_url=self.config.get("booking_url", "")
         )
-        print(f"[Kutschera] Found {len(slots)} slots.")
+        print(f"[Kutschera] Found {len(slots)} slots ({mode}).")
         return [doctor]
+
+    async def _scrape_http(self) -> List[str]:
+        async with self.cookie_http() as session:
+            # Visit main page first to get the PHP session cookie
+            start_url = URL(self.config.get("session_url", DEFAULT_START_URL))
+            async with session.get(start_url) as resp:
+                resp.raise_for_status()
+                await resp.read()
+            cookies = session.cookie_jar.filter_cookies(start_url)
+            if not cookies:
+                raise RuntimeError("no session cookie")
+            # The cookie may be path-scoped to the landing page; the PHP endpoints need it too
+            session.cookie_jar.update_cookies({name: morsel.value for name, morsel in cookies.items()},
+                                              response_url=URL(BASE_URL + "/"))
+
+            async def post_request(url, data):
+                form = {k: str(v) for k, v in data.items()}
+                async with session.post(url, data=form) as resp:
+                    resp.raise_for_status()
+                    return await resp.text()
+
+            # Unparseable overview responses mean the session was not accepted: raise, so scrape() falls back
+            return await self._collect(post_request, concurrency=HTTP_DAY_CONCURRENCY, delay=0.0, strict=True)
+
+    async def _scrape_browser(self) -> List[str]:
+        async with self.browser_context(
+            user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
+        ) as context:
+            page = await context.new_page()
+
+            # Visit main page first to get cookies/session
+            await page.goto(self.config.get("session_url", DEFAULT_START_URL), wait_until="domcontentloaded")
+
+            async def post_request(url, data):
+                # Use page.evaluate to ensure we use the same fetch context as the page
+                # This is more robust than context.request.post for some PHP sessions
+                return await page.evaluate(BROWSER_POST_JS, {"url": url, "data": data})
+
+            return await self._collect(post_request, concurrency=self.WINDOW_CONCURRENCY, delay=0.1)
+
+    async def _collect(self, post_request, concurrency: int, delay: float, strict: bool = False) -> List[str]:
+        """
+        Urlaub + Termine overview, then the day details of the open days.
+        strict: raise on unparseable overview responses instead of marking the scrape failed.
+        """
+        kunden_id = self.config.get("kunden_id", 385)
+        blockzeit = self.config.get("blockzeit", 30)
+
+        heute = datetime.now()
+        ende = self.budget.horizon_end(180)
+        datum_start = heute.strftime("%Y-%m-%d")
+        datum_ende = ende.strftime("%Y-%m-%d")
+
+        # 1. Urlaub
+        urlaub_text = await post_request(URL_URLAUB, {
+            'kunden_id': kunden_id, 'datum_start': datum_start, 'datum_ende': datum_ende
+        })
+        try:
+            urlaub_set = set(json.loads(urlaub_text))
+        except (ValueError, TypeError):
+            if strict:
+                raise RuntimeError(f"unparseable Urlaub response: {urlaub_text[:100]!r}")
+            print(f"[Kutschera] Failed to parse Urlaub. Text: {urlaub_text[:100]}")
+            self.failed = True
+            urlaub_set = set()
+
+        # 2. Termine
+        termine_text = await post_request(URL_TERMINE, {
+            'kunden_id': kunden_id, 'datum_start': datum_start, 'datum_ende': datum_ende, 'blockzeit': blockzeit
+        })
+
+        try:
+            termine_data = json.loads(termine_text)
+            print(f"[Kutschera] Got {len(termine_data)} entries.")
+        except (ValueError, TypeError):
+            if strict:
+                raise RuntimeError(f"unparseable Termine response: {termine_text[:100]!r}")
+            print(f"[Kutschera] Failed to parse Termine. Text: {termine_text[:100]}")
+            self.failed = True
+            termine_data = []
+
+        # 3. Day details
+        day_windows = []
+        for eintrag in termine_data:
+            if isinstance(eintrag, list): datum_str = eintrag[0]
+            elif isinstance(eintrag, dict): datum_str = eintrag.get('datum', '')
+            else: datum_str = str(eintrag)
+
+            if datum_str not in urlaub_set:
+                day_windows.append(datum_str)
+
+        async def fetch_day(datum_str):
+            try:
+                d_obj = datetime.strptime(datum_str, "%Y-%m-%d")
+                js_wochentag = (d_obj.weekday() + 1) % 7
+
+                detail_text = await post_request(URL_DETAILS, {
+                    'kunden_id': kunden_id, 'wochentag': js_wochentag, 'blockzeit': blockzeit, 'datum': datum_str
+                })
+                return _parse_day(datum_str, detail_text)
+            except Exception:
+                return None
+
+        def enough(found):
+            # At most MAX_DAYS_WITH_SLOTS days with free slots, or the slot budget
+            days_with_slots = {slot[:10] for slot in found}
+            return len(days_with_slots) >= MAX_DAYS_WITH_SLOTS or self.budget.satisfied(found)
+
+        slots = await self.fetch_windows(day_windows, fetch_day, satisfied=enough,
+                                         concurrency=concurrency, delay=delay)
+        if not self.failed:
+            # Days missing from the Termine list have no free slots, so the whole range was covered
+            self.budget.cover(ende)
+        return slots
@@ -1,11 +1,16 @@
-import requests
-import asyncio
 from datetime import datetime, timedelta
 from typing import List
 from core.models import Doctor
-from .base import BaseScraper
+from .base import BaseScraper, date_windows
+
+# Latido's own lookahead limit and window size (API supports large ranges)
+MAX_DAYS = 180
+WINDOW_DAYS = 90
 
 class LatidoScraper(BaseScraper):
+    HOST = "patient.latido.at"
+    WINDOW_CONCURRENCY = 2
+
     async def scrape(self) -> List[Doctor]:
         print(f"[Latido] Scraping {self.doctor_name}...")
         
@@ -20,41 +25,52 @@ class LatidoScraper(BaseScraper):
         }
         
         slots = []
-        loop = asyncio.get_event_loop()
         
         try:
             start_date = datetime.now()
-            # Search 6 months ahead to catch distant appointments
-            end_date_limit = start_date + timedelta(days=180)
-            current_start = start_date
+            # Search 6 months ahead to catch distant appointments (or less, if the budget's horizon is shorter)
+            end_date_limit = start_date + timedelta(days=self.budget.lookahead_days(MAX_DAYS))
             
-            while current_start < end_date_limit:
-                # Use 90-day chunks to minimize requests (API supports large ranges)
-                current_end = current_start + timedelta(days=90)
-                
-                params = {
-                    "doctorid": doctor_id,
-                    "calendarid": calendar_id,
-                    "typeid": type_id,
-                    "start": current_start.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
-                    "end": current_end.strftime("%Y-%m-%dT%H:%M:%S.999Z")
-                }
-                
-                resp = await loop.run_in_executor(None, lambda: requests.get(api_url, params=params, headers=headers))
-                
-                if resp.status_code == 200:
-                    data = resp.json()
-                    for slot in data:
-                        start_utc = slot.get("start") # 2025-12-04T07:00:00.000Z
-                        if start_utc:
-                            # Convert to ISO (keep UTC or naive)
-                            slots.append(start_utc)
+            async with self.http() as session:
+                async def fetch_window(window):
+                    current_start, current_end = window
+                    # aiohttp only accepts str/int query values
+                    params = {
+                        k: v for k, v in {
+                            "doctorid": doctor_id,
+                            "calendarid": calendar_id,
+                            "typeid": type_id,
+                            "start": current_start.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+                            "end": current_end.strftime("%Y-%m-%dT%H:%M:%S.999Z")
+                        }.items() if v is not None
+                    }
+                    
+                    try:
+                        async with session.get(api_url, params=params, headers=headers) as resp:
+                            if resp.status != 200:
+                                print(f"[Latido] API Error: {resp.status}")
+                                return None
+                            data = await resp.json(content_type=None)
+                    except Exception as e:
+                        # Keep the other window's slots
+                        print(f"[Latido] Window error: {e}")
+                        return None
+                    if not isinstance(data, list):
+                        print(f"[Latido] Unexpected response: {str(data)[:100]}")
+                        return None
+                    # start is UTC, e.g. 2025-12-04T07:00:00.000Z (kept as-is)
+                    return [slot.get("start") for slot in data if slot.get("start")]
                 
-                current_start = current_end
-                await asyncio.sleep(0.1)
+                # Windows are independent, so both 90-day chunks run in parallel
+                slots = await self.fetch_windows(
+                    list(date_windows(start_date, end_date_limit, WINDOW_DAYS)), fetch_window, delay=0.1,
+                    # Window bounds are sent as UTC; read as Vienna time they end slightly early (conservative)
+                    window_end=lambda window: window[1]
+                )
                 
         except Exception as e:
             print(f"[Latido] Error: {e}")
+            self.failed = True
             
         doctor = Doctor(
             id=self.doctor_id,
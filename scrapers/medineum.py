@@ -1,176 +1,281 @@
 import json
 import asyncio
 from datetime import datetime, timedelta
-from typing import List
+from typing import Dict, List, Optional
 from core.models import Doctor
 from .base import BaseScraper
-from playwright.async_api import async_playwright
 
-class MedineumScraper(BaseScraper):
+API_URL = "https://de.cgmlife.com/Appointment/AppointmentService/getNextPossibleProposals"
+ESERVICES_URL = "https://de.cgmlife.com/eservices/#/?institution={institution_id}"
+
+FETCH_JS = """
+    async ({url, token, payload}) => {
+        const response = await fetch(url, {
+            method: 'POST',
+            headers: {
+                'cgm-identity': token,
+                'accept': 'application/json',
+                'content-type': 'application/json'
+            },
+            body: JSON.stringify(payload)
+        });
+        const text = await response.text();
+        return {
+            status: response.status,
+            url: response.url,
+            text: text
+        };
+    }
+"""
+
+# Keys under which a proposal may name its appointment type. Not confirmed against a
+# captured response: batched fetches check the first page and switch to per-type
+# paging right away if none of them matches.
+PROPOSAL_TYPE_KEYS = ("appointmentTypeId", "appointmentTypeID", "typeId", "appointmentType")
+
+
+def _parse_proposal(prop: dict) -> Optional[str]:
+    date_str = prop.get('date')
+    time_str = prop.get('time')
+    try:
+        # Time format is HH:MM:SS
+        return datetime.strptime(f"{date_str} {time_str}", "%Y-%m-%d %H:%M:%S").isoformat()
+    except ValueError:
+        # Fallback for HH:MM
+        try:
+            return datetime.strptime(f"{date_str} {time_str}", "%Y-%m-%d %H:%M").isoformat()
+        except:
+            return None
+    except Exception as e:
+        print(f"[Medineum Debug] Date parse error: {e}")
+        return None
+
+
+def _proposal_type_id(prop: dict) -> Optional[str]:
+    for key in PROPOSAL_TYPE_KEYS:
+        value = prop.get(key)
+        if isinstance(value, dict):
+            value = value.get("id")
+        if value:
+            return value
+    return None
+
+
+class MedineumInstitutionScraper(BaseScraper):
+    """
+    Scrapes all Medineum doctors of one cgmlife institution in a single browser session.
+    The cgm-identity token is acquired once and proposals for all appointment types are
+    fetched in one batched request series, then split back into one Doctor per config.
+    """
+    HOST = "de.cgmlife.com"
+
+    def __init__(self, doctor_configs: List[dict], **kwargs):
+        super().__init__(doctor_configs[0], **kwargs)
+        self.configs = doctor_configs
+        self.institution_id = self.config.get("institution_id")
+
+    async def _get_token(self, page) -> Optional[str]:
+        token_future = asyncio.Future()
+
+        async def handle_request(request):
+            # Only capture token from the specific API call we care about, or after full load
+            if 'cgm-identity' in request.headers and not token_future.done():
+                # Verify it's not empty
+                val = request.headers['cgm-identity']
+                if len(val) > 10:
+                    token_future.set_result(val)
+
+        page.on("request", handle_request)
+
+        try:
+            await page.goto(ESERVICES_URL.format(institution_id=self.institution_id), wait_until="networkidle", timeout=30000)
+            # Wait a bit more to ensure we have the latest token
+            await asyncio.sleep(3)
+            return await asyncio.wait_for(token_future, timeout=10)
+        except Exception as e:
+            print(f"[Medineum] Failed to get token: {e}")
+            return None
+
+    def _budget_met(self, proposals: List[dict], type_ids: List[str]) -> bool:
+        """True once every requested type has enough future slots."""
+        by_type: Dict[Optional[str], List[str]] = {}
+        for prop in proposals:
+            iso = _parse_proposal(prop)
+            if iso:
+                by_type.setdefault(_proposal_type_id(prop), []).append(iso)
+        if len(type_ids) == 1:
+            # Single type: every proposal belongs to it, typed or not
+            return self.budget.satisfied(iso for slots in by_type.values() for iso in slots)
+        return all(self.budget.satisfied(by_type.get(t, [])) for t in type_ids)
+
+    async def _fetch_proposals(self, page, token: str, type_ids: List[str]) -> List[dict]:
+        """Pages getNextPossibleProposals for the given appointment types."""
+        heute = datetime.now()
+        ende = self.budget.horizon_end()
+        datum_ende_str = ende.strftime("%Y-%m-%d")
+
+        # Each page covers all requested types, so allow a few more pages for batches
+        max_loops = 5 * max(1, min(len(type_ids), 3))
+        # Pages are not independent: each one starts the day after the previous page's last proposal
+        cursor = {"start": heute.strftime("%Y-%m-%d")}
+
+        def pages():
+            for _ in range(max_loops):
+                if cursor["start"] is None:
+                    return
+                yield cursor["start"]
+
+        async def fetch_page(current_start_date):
+            cursor["start"] = None
+            payload = [
+                self.institution_id,
+                type_ids,
+                current_start_date,
+                datum_ende_str,
+                None, None, None
+            ]
+
+            try:
+                # Execute fetch in browser to ensure cookies are used
+                resp_data = await page.evaluate(FETCH_JS, {"url": API_URL, "token": token, "payload": payload})
+
+                if resp_data['status'] != 200:
+                    print(f"[Medineum] API Error: {resp_data['status']}")
+                    self.failed = True
+                    return []
+
+                try:
+                    proposals = json.loads(resp_data['text'])
+                except ValueError:
+                    print(f"[Medineum] Unparseable response: {resp_data['text'][:100]}")
+                    self.failed = True
+                    return []
+
+                if not proposals:
+                    # No further proposals up to the horizon
+                    self.budget.cover(ende)
+                    return []
+
+                if len(type_ids) > 1 and any(_proposal_type_id(p) not in type_ids for p in proposals):
+                    # Batched pages are useless if proposals don't name their type; stop here and
+                    # let scrape() page per type instead of finishing the batched loop
+                    print("[Medineum] Proposals carry no type id, stopping batched paging.")
+                    return proposals
+
+            except Exception as e:
+                print(f"[Medineum] Fetch error: {e}")
+                self.failed = True
+                return []
+
+            # Next date logic
+            try:
+                last_date = datetime.strptime(proposals[-1].get('date'), "%Y-%m-%d")
+            except Exception as e:
+                print(f"[Medineum] Fetch error: {e}")
+                return proposals
+            next_start = last_date + timedelta(days=1)
+            if next_start <= ende:
+                cursor["start"] = next_start.strftime("%Y-%m-%d")
+            else:
+                self.budget.cover(ende)
+            return proposals
+
+        proposals = await self.fetch_windows(
+            pages(), fetch_page,
+            key=lambda prop: (prop.get('date'), prop.get('time'), _proposal_type_id(prop)),
+            satisfied=lambda proposals: self._budget_met(proposals, type_ids),
+            concurrency=1,
+            delay=0.2,
+            planned=max_loops,
+        )
+        if cursor["start"] is not None:
+            # max_loops ran out before the horizon
+            self.budget.truncated = True
+        return proposals
+
     async def scrape(self) -> List[Doctor]:
-        print(f"[Medineum] Scraping {self.doctor_name}...")
-        
-        institution_id = self.config.get("institution_id")
-        appt_type_id = self.config.get("appointment_type_id")
-        api_url = "https://de.cgmlife.com/Appointment/AppointmentService/getNextPossibleProposals"
-        
-        slots = []
-        
+        type_ids = []
+        for cfg in self.configs:
+            type_id = cfg.get("appointment_type_id")
+            if type_id and type_id not in type_ids:
+                type_ids.append(type_id)
+
+        print(f"[Medineum] Scraping institution {self.institution_id} ({len(self.configs)} doctors, {len(type_ids)} types)...")
+
+        slots_by_type: Dict[str, List[str]] = {t: [] for t in type_ids}
+
         try:
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(headless=True)
-                context = await browser.new_context(
-                    user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
-                )
+            async with self.browser_context(
+                user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
+            ) as context:
                 page = await context.new_page()
-                
-                token_future = asyncio.Future()
-                
-                async def handle_request(request):
-                    # Only capture token from the specific API call we care about, or after full load
-                    if 'cgm-identity' in request.headers and not token_future.done():
-                        # Verify it's not empty
-                        val = request.headers['cgm-identity']
-                        if len(val) > 10:
-                            token_future.set_result(val)
-
-                page.on("request", handle_request)
-                
-                try:
-                    await page.goto("https://de.cgmlife.com/eservices/#/?institution=ef406de6-589d-494b-8200-9ed7de4dc914", wait_until="networkidle", timeout=30000)
-                    # Wait a bit more to ensure we have the latest token
-                    await asyncio.sleep(3)
-                    token = await asyncio.wait_for(token_future, timeout=10)
-                except Exception as e:
-                    print(f"[Medineum] Failed to get token: {e}")
-                    await browser.close()
+
+                token = await self._get_token(page)
+                if not token:
                     return []
 
-                # Fetch Loop
-                heute = datetime.now()
-                ende = heute + timedelta(days=365)
-                current_start_date = heute.strftime("%Y-%m-%d")
-                datum_ende_str = ende.strftime("%Y-%m-%d")
-                
-                max_loops = 5 # Reduced for demo speed
-                loop_count = 0
-                
-                # Fetch Loop using page.evaluate to ensure cookies are used
-                heute = datetime.now()
-                ende = heute + timedelta(days=365)
-                current_start_date = heute.strftime("%Y-%m-%d")
-                datum_ende_str = ende.strftime("%Y-%m-%d")
-                
-                max_loops = 5
-                loop_count = 0
-                
-                while loop_count < max_loops:
-                    loop_count += 1
-                    
-                    # We pass the payload and url to the browser
-                    # We use fetch() inside the browser
-                    js_code = """
-                        async (args) => {
-                            const response = await fetch(args.url, {
-                                method: 'POST',
-                                headers: {
-                                    'cgm-identity': args.token,
-                                    'accept': 'application/json',
-                                    'content-type': 'application/json'
-                                },
-                                body: JSON.dumps(args.payload)
-                            });
-                            return await response.json();
-                        }
-                    """
-                    
-                    payload = [
-                        institution_id,
-                        [appt_type_id],
-                        current_start_date,
-                        datum_ende_str,
-                        None, None, None
-                    ]
-                    
-                    try:
-                        # Execute fetch in browser
-                        # Return raw details to debug
-                        resp_data = await page.evaluate("""
-                            async ({url, token, payload}) => {
-                                const response = await fetch(url, {
-                                    method: 'POST',
-                                    headers: {
-                                        'cgm-identity': token,
-                                        'accept': 'application/json',
-                                        'content-type': 'application/json'
-                                    },
-                                    body: JSON.stringify(payload)
-                                });
-                                const text = await response.text();
-                                return {
-                                    status: response.status,
-                                    url: response.url,
-                                    text: text
-                                };
-                            }
-                        """, {"url": api_url, "token": token, "payload": payload})
-                        
-                        if resp_data['status'] != 200:
-                            print(f"[Medineum] API Error: {resp_data['status']}")
-                            break
-                            
-                        try:
-                            proposals = json.loads(resp_data['text'])
-                        except:
-                            break
-                            
-                        for prop in proposals:
-                            date_str = prop.get('date')
-                            time_str = prop.get('time')
-                            try:
-                                # Time format is HH:MM:SS
-                                dt = datetime.strptime(f"{date_str} {time_str}", "%Y-%m-%d %H:%M:%S")
-                                slots.append(dt.isoformat())
-                            except ValueError:
-                                # Fallback for HH:MM
-                                try:
-                                    dt = datetime.strptime(f"{date_str} {time_str}", "%Y-%m-%d %H:%M")
-                                    slots.append(dt.isoformat())
-                                except:
-                                    pass
-                            except Exception as e:
-                                print(f"[Medineum Debug] Date parse error: {e}")
-                                
-                        if not proposals:
-                            break
-
-                        # Next date logic
-                        last_prop = proposals[-1]
-                        last_date = datetime.strptime(last_prop.get('date'), "%Y-%m-%d")
-                        next_start = last_date + timedelta(days=1)
-                        if next_start > ende:
-                            break
-                        current_start_date = next_start.strftime("%Y-%m-%d")
-                        
-                        await asyncio.sleep(0.2)
-                        
-                    except Exception as e:
-                        print(f"[Medineum] Fetch error: {e}")
-                        break
-                
-                await browser.close()
-                    
+                proposals = await self._fetch_proposals(page, token, type_ids) if type_ids else []
+
+                unassigned = []
+                for prop in proposals:
+                    iso = _parse_proposal(prop)
+                    if not iso:
+                        continue
+                    prop_type = _proposal_type_id(prop)
+                    if prop_type in slots_by_type:
+                        slots_by_type[prop_type].append(iso)
+                    else:
+                        unassigned.append(iso)
+
+                if len(type_ids) == 1:
+                    slots_by_type[type_ids[0]].extend(unassigned)
+                elif unassigned:
+                    # Response does not name the type: fall back to per-type paging,
+                    # still reusing this session and token
+                    print("[Medineum] Proposals carry no type id, fetching per type.")
+                    for type_id in type_ids:
+                        type_props = await self._fetch_proposals(page, token, [type_id])
+                        slots_by_type[type_id] = [iso for iso in map(_parse_proposal, type_props) if iso]
+
         except Exception as e:
             print(f"[Medineum] Error: {e}")
-            
-        doctor = Doctor(
-            id=self.doctor_id,
-            name=self.doctor_name,
-            address=self.config.get("address", "Klagenfurt"),
-            speciality=self.config.get("speciality", "Allgemeinmedizin"),
-            insurance=self.config.get("insurance", ["Alle Kassen"]),
-            slots=slots,
-            booking_url=self.config.get("booking_url", "")
+            self.failed = True
+
+        doctors = []
+        for cfg in self.configs:
+            slots = sorted(set(slots_by_type.get(cfg.get("appointment_type_id"), [])))
+            doctors.append(Doctor(
+                id=cfg.get("id"),
+                name=cfg.get("name"),
+                address=cfg.get("address", "Klagenfurt"),
+                speciality=cfg.get("speciality", "Allgemeinmedizin"),
+                insurance=cfg.get("insurance", ["Alle Kassen"]),
+                slots=slots,
+                booking_url=cfg.get("booking_url", "")
+            ))
+            print(f"[Medineum] {cfg.get('name')}: Found {len(slots)} slots.")
+        return doctors
+
+
+class MedineumScraper(BaseScraper):
+    HOST = "de.cgmlife.com"
+
+    async def scrape(self) -> List[Doctor]:
+        # Single doctor = institution batch of one
+        institution = MedineumInstitutionScraper(
+            [self.config],
+            browser_pool=self.browser_pool,
+            http_session=self.http_session,
+            budget=self.budget
         )
-        print(f"[Medineum] Found {len(slots)} slots.")
-        return [doctor]
+        doctors = await institution.scrape()
+        self.failed = institution.failed
+        return doctors
+
+
+def group_by_institution(doctor_configs: List[dict]) -> List[List[dict]]:
+    """Groups medineum registry entries by institution_id (order preserved)."""
+    groups: Dict[str, List[dict]] = {}
+    for cfg in doctor_configs:
+        groups.setdefault(cfg.get("institution_id"), []).append(cfg)
+    return list(groups.values())
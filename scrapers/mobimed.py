@@ -1,5 +1,3 @@
-import requests
-import asyncio
 from datetime import datetime, timedelta
 import urllib.parse
 from typing import List
@@ -7,6 +5,8 @@ from core.models import Doctor
 from .base import BaseScraper
 
 class MobimedScraper(BaseScraper):
+    HOST = "scheduler.mobimed.at"
+
     async def scrape(self) -> List[Doctor]:
         print(f"[Mobimed] Scraping {self.doctor_name}...")
         
@@ -46,29 +46,30 @@ class MobimedScraper(BaseScraper):
         }
         
         slots = []
-        loop = asyncio.get_event_loop()
         
         try:
-            resp = await loop.run_in_executor(None, lambda: requests.get(url, headers=headers))
-            
-            if resp.status_code == 200:
-                data = resp.json()
-                # Data structure: {"slots": [{"start": "...", "end": "...", ...}, ...]}
-                # Or maybe it's a list directly? The analysis log didn't show the body of slots response.
-                # Usually it's a list or dict with "slots".
-                
-                slots_data = data.get("slots", []) if isinstance(data, dict) else data
-                
-                for slot in slots_data:
-                    start_time = slot.get("date")
-                    if start_time:
-                        slots.append(start_time)
-                
-            else:
-                print(f"[Mobimed] API Error: {resp.status_code}")
+            async with self.http() as session:
+                async with session.get(url, headers=headers) as resp:
+                    if resp.status == 200:
+                        data = await resp.json(content_type=None)
+                        # Data structure: {"slots": [{"start": "...", "end": "...", ...}, ...]}
+                        # Or maybe it's a list directly? The analysis log didn't show the body of slots response.
+                        # Usually it's a list or dict with "slots".
+                        
+                        slots_data = data.get("slots", []) if isinstance(data, dict) else data
+                        
+                        for slot in slots_data:
+                            start_time = slot.get("date")
+                            if start_time:
+                                slots.append(start_time)
+                        
+                    else:
+                        print(f"[Mobimed] API Error: {resp.status}")
+                        self.failed = True
                 
         except Exception as e:
             print(f"[Mobimed] Error: {e}")
+            self.failed = True
             
         doctor = Doctor(
             id=self.doctor_id,
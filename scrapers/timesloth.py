@@ -1,11 +1,11 @@
-import requests
-import asyncio
 from datetime import datetime
 from typing import List
 from core.models import Doctor
 from .base import BaseScraper
 
 class TimeslothScraper(BaseScraper):
+    HOST = "api.timesloth.io"
+
     async def scrape(self) -> List[Doctor]:
         print(f"[Timesloth] Scraping {self.doctor_name}...")
         
@@ -28,25 +28,26 @@ class TimeslothScraper(BaseScraper):
         }
         
         slots = []
-        loop = asyncio.get_event_loop()
         
         try:
-            resp = await loop.run_in_executor(None, lambda: requests.get(api_url, headers=headers))
-            
-            if resp.status_code == 200:
-                data = resp.json()
-                for item in data:
-                    timestamp_ms = item.get("start")
-                    if timestamp_ms:
-                        # Convert ms to seconds
-                        dt = datetime.fromtimestamp(timestamp_ms / 1000.0)
-                        # Format to ISO 8601
-                        slots.append(dt.isoformat())
-            else:
-                print(f"[Timesloth] API Error: {resp.status_code}")
+            async with self.http() as session:
+                async with session.get(api_url, headers=headers) as resp:
+                    if resp.status == 200:
+                        data = await resp.json(content_type=None)
+                        for item in data:
+                            timestamp_ms = item.get("start")
+                            if timestamp_ms:
+                                # Convert ms to seconds
+                                dt = datetime.fromtimestamp(timestamp_ms / 1000.0)
+                                # Format to ISO 8601
+                                slots.append(dt.isoformat())
+                    else:
+                        print(f"[Timesloth] API Error: {resp.status}")
+                        self.failed = True
                 
         except Exception as e:
             print(f"[Timesloth] Error: {e}")
+            self.failed = True
             
         doctor = Doctor(
             id=self.doctor_id,
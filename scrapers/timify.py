@@ -1,14 +1,13 @@
 import asyncio
 import re
 from typing import List
-from playwright.async_api import async_playwright
 from core.models import Doctor
 from scrapers.base import BaseScraper
 from datetime import datetime
 
 class TimifyScraper(BaseScraper):
-    def __init__(self, config):
-        super().__init__(config)
+    def __init__(self, config, **kwargs):
+        super().__init__(config, **kwargs)
         self.booking_url = config.get("booking_url")
         self.service_filter = config.get("service_filter")
         
@@ -30,13 +29,10 @@ class TimifyScraper(BaseScraper):
     async def scrape(self) -> List[Doctor]:
         print(f"[Timify] Scraping {self.doctor.name} (UI)...")
         
-        async with async_playwright() as p:
-            # Launch browser
-            browser = await p.chromium.launch(headless=True)
-            context = await browser.new_context(
-                user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-                locale="de-DE"
-            )
+        async with self.browser_context(
+            user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+            locale="de-DE"
+        ) as context:
             page = await context.new_page()
             
             try:
@@ -48,7 +44,6 @@ class TimifyScraper(BaseScraper):
                     await page.wait_for_selector(".ta-services__service", timeout=20000)
                 except:
                     print(f"[Timify] No services found/loaded for {self.doctor.name}")
-                    await browser.close()
                     return [self.doctor]
 
                 # 2. Select Service
@@ -92,8 +87,15 @@ class TimifyScraper(BaseScraper):
                 # 4. Extract Slots
                 unique_slots = set()
                 
-                # We will check 4 weeks
-                for week_idx in range(4):
+                # We will check 4 weeks (fewer once the slot budget is met)
+                max_weeks = 4
+                for week_idx in range(max_weeks):
+                    if unique_slots and self.budget.satisfied(unique_slots):
+                        self.budget.skip(max_weeks - week_idx)
+                        break
+                    if week_idx > 0:
+                        # Every week after the first costs a datepicker round trip
+                        self.budget.request()
                     # Check for "Show More" buttons and click them to reveal all slots
                     show_more_btns = page.locator(".ta-slots__show-more")
                     count_more = await show_more_btns.count()
@@ -169,7 +171,6 @@ class TimifyScraper(BaseScraper):
 
             except Exception as e:
                 print(f"[Timify] UI Error: {e}")
-                
-            await browser.close()
+                self.failed = True
         
         return [self.doctor]
@@ -0,0 +1,135 @@
+"""
+Benchmark: core.read_model.consolidate_data vs. the previous O(n²) implementation.
+
+Usage: python scripts/bench_consolidate.py [doctors] [slots_per_doctor]
+Default: 10k doctors / 500k slots. Verifies that both produce identical output.
+"""
+import os
+import random
+import re
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.read_model import consolidate_data, normalize_speciality, classify_service
+from core.slot_codec import to_local_datetime
+
+
+def consolidate_data_reference(doctors_json):
+    """Previous implementation (any() duplicate check per slot), kept for comparison."""
+    aggregated_doctors = {}
+    for doc_id, doc in doctors_json.items():
+        raw_name = doc.get("name", "Unknown")
+        group_key = doc.get("group_id")
+        base_service_name = "Termin"
+        match = re.match(r"^(.*?)\s*\((.*?)\)$", raw_name)
+        if match:
+            if not group_key:
+                group_key = match.group(1).strip()
+            base_service_name = match.group(2).strip()
+        elif " | " in raw_name:
+            parts = raw_name.split(" | ")
+            if not group_key:
+                group_key = parts[0].strip()
+            if len(parts) > 1:
+                base_service_name = parts[1].strip()
+        if not group_key:
+            group_key = raw_name
+        if group_key not in aggregated_doctors:
+            aggregated_doctors[group_key] = {
+                "name": group_key,
+                "speciality": normalize_speciality(doc.get("speciality", "")),
+                "address": doc.get("address", ""),
+                "insurance": doc.get("insurance", []),
+                "booking_url": doc.get("booking_url"),
+                "latitude": doc.get("latitude"),
+                "longitude": doc.get("longitude"),
+                "slots": []
+            }
+
+        def add_appt(slot_str, s_name):
+            dt_naive = to_local_datetime(slot_str)
+            if dt_naive is None:
+                return
+            if any(s["datetime"] == dt_naive and s["service_name"] == s_name for s in aggregated_doctors[group_key]["slots"]):
+                return
+            category, color = classify_service(s_name)
+            aggregated_doctors[group_key]["slots"].append({
+                "datetime": dt_naive,
+                "time_str": dt_naive.strftime("%H:%M"),
+                "date_str": dt_naive.strftime("%d.%m.%Y"),
+                "day_name": dt_naive.strftime("%a"),
+                "service_name": s_name,
+                "category": category,
+                "color": color,
+                "booking_url": doc.get("booking_url", aggregated_doctors[group_key]["booking_url"]),
+                "show_time": doc.get("show_time", True)
+            })
+
+        app_types = doc.get("appointment_types", [])
+        has_typed_slots = False
+        for t in app_types:
+            if t.get("slots"):
+                label = t.get("name", base_service_name)
+                for s in t.get("slots", []):
+                    add_appt(s, label)
+                has_typed_slots = True
+        if not has_typed_slots:
+            for s in doc.get("slots", []):
+                add_appt(s, base_service_name)
+
+    result_doctors = []
+    for key, data in aggregated_doctors.items():
+        if data["slots"]:
+            data["slots"].sort(key=lambda x: x["datetime"])
+            data["next_slot"] = data["slots"][0]["datetime"]
+            result_doctors.append(data)
+    result_doctors.sort(key=lambda x: x["next_slot"])
+    return result_doctors
+
+
+def generate(n_doctors, slots_per_doctor, seed=42):
+    rnd = random.Random(seed)
+    base = datetime(2026, 9, 1, 7, 0)
+    specs = ["Allgemeinmedizin", "Innere Medizin", "Kinder- und Jugendheilkunde", "HNO", "Zahnarzt"]
+    data = {}
+    for i in range(n_doctors):
+        # Every 4th entry is a service variant of the previous doctor ("Name | Service")
+        group = f"Dr. Test {i - i % 4}"
+        name = f"{group} | Service {i % 4}" if i % 4 else f"{group} (Termin)"
+        slots = []
+        for _ in range(slots_per_doctor):
+            dt = base + timedelta(minutes=10 * rnd.randrange(0, 6 * 24 * 90))
+            # Mix of naive local and UTC 'Z' strings like the real scrapers
+            slots.append(dt.isoformat() if rnd.random() < 0.7 else dt.strftime("%Y-%m-%dT%H:%M:%S.000Z"))
+        data[f"doc_{i}"] = {
+            "id": f"doc_{i}", "name": name, "address": "Teststraße 1, 9020 Klagenfurt",
+            "speciality": rnd.choice(specs), "insurance": ["ÖGK"], "slots": slots,
+            "booking_url": f"https://example.invalid/{i}"
+        }
+    return data
+
+
+def main():
+    n_doctors = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    per_doctor = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    data = generate(n_doctors, per_doctor)
+    print(f"{n_doctors} doctors / {n_doctors * per_doctor} slots")
+
+    t0 = time.perf_counter()
+    new = consolidate_data(data)
+    t_new = time.perf_counter() - t0
+    print(f"consolidate_data:           {t_new:.2f}s")
+
+    t0 = time.perf_counter()
+    old = consolidate_data_reference(data)
+    t_old = time.perf_counter() - t0
+    print(f"reference (previous) impl:  {t_old:.2f}s")
+
+    print(f"speedup: {t_old / t_new:.1f}x, identical output: {new == old}")
+
+
+if __name__ == "__main__":
+    main()
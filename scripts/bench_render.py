@@ -0,0 +1,50 @@
+"""
+Benchmark: result card HTML for 50 vs 1000 matching doctors.
+
+Compares the previous rendering (every card, all hidden slots inlined in <details>)
+with the paginated one (first page only, hidden slots rendered on expand).
+Measures HTML payload bytes and server-side generation time only.
+
+Limitation: this does not measure render cost in the browser (parse, style, layout,
+paint of the Streamlit page). Payload size and the number of DOM nodes are used as
+a proxy for it; a real browser number needs the dashboard served and timed in
+Chromium (e.g. Playwright with the Performance API), which this script does not do.
+
+Usage: python scripts/bench_render.py [slots_per_doctor]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.card_renderer import PAGE_SIZE, render_card, render_card_legacy
+from core.read_model import consolidate_data
+from scripts.bench_consolidate import generate
+
+
+def measure(render, docs, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        payload = sum(len(render(d).encode("utf-8")) for d in docs)
+        best = min(best, time.perf_counter() - t0)
+    return payload, best
+
+
+def main():
+    per_doctor = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    # One doctor per group (generate() groups 4 entries), so 4x entries per result
+    doctors = consolidate_data(generate(4 * 1000, per_doctor))
+    print(f"{len(doctors)} consolidated doctors, ~{per_doctor * 4} slots each")
+
+    for n in (50, 1000):
+        results = doctors[:n]
+        legacy_bytes, legacy_time = measure(render_card_legacy, results)
+        paged_bytes, paged_time = measure(render_card, results[:PAGE_SIZE])
+        print(f"{n:>5} results | all cards + <details>: {legacy_bytes / 1024:9.1f} KiB {legacy_time * 1000:8.1f} ms"
+              f" | first page ({PAGE_SIZE}): {paged_bytes / 1024:7.1f} KiB {paged_time * 1000:6.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
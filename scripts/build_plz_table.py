@@ -0,0 +1,62 @@
+"""
+Generates config/at_plz_centroids.csv from the GeoNames postal code dump for Austria
+(https://download.geonames.org/export/zip/AT.zip, CC BY 4.0), which carries the
+official Post PLZ/Ort list with coordinates.
+
+One row per (PLZ, Ort), sorted by PLZ. Coordinates are rounded to 4 decimals (~10 m);
+core.geocoder.PostcodeGazetteer uses the first row of a PLZ and the first PLZ of a name.
+
+Usage: python scripts/build_plz_table.py [AT.txt or AT.zip]   (downloads AT.zip if omitted)
+"""
+import csv
+import io
+import os
+import sys
+import zipfile
+import requests
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+OUTPUT_PATH = os.path.join(ROOT_DIR, "config", "at_plz_centroids.csv")
+SOURCE_URL = "https://download.geonames.org/export/zip/AT.zip"
+
+# GeoNames postal code columns (tab separated, no header)
+COL_PLZ, COL_PLACE, COL_LAT, COL_LON = 1, 2, 9, 10
+
+
+def read_source(path=None) -> str:
+    if path is None:
+        resp = requests.get(SOURCE_URL, timeout=60)
+        resp.raise_for_status()
+        data = resp.content
+    else:
+        with open(path, "rb") as f:
+            data = f.read()
+    if data[:2] == b"PK":
+        with zipfile.ZipFile(io.BytesIO(data)) as zf:
+            data = zf.read("AT.txt")
+    return data.decode("utf-8")
+
+
+def build_rows(text: str):
+    rows = {}
+    for line in text.splitlines():
+        cols = line.split("\t")
+        if len(cols) <= COL_LON or not cols[COL_PLZ].isdigit():
+            continue
+        key = (cols[COL_PLZ], cols[COL_PLACE].strip())
+        rows.setdefault(key, (round(float(cols[COL_LAT]), 4), round(float(cols[COL_LON]), 4)))
+    # Stable order: PLZ, then source order within a PLZ (dicts keep insertion order)
+    return sorted(((plz, ort, lat, lon) for (plz, ort), (lat, lon) in rows.items()), key=lambda r: r[0])
+
+
+def main():
+    rows = build_rows(read_source(sys.argv[1] if len(sys.argv) > 1 else None))
+    with open(OUTPUT_PATH, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f, delimiter=";", lineterminator="\n")
+        writer.writerow(["plz", "ort", "lat", "lon"])
+        writer.writerows([plz, ort, f"{lat:.4f}", f"{lon:.4f}"] for plz, ort, lat, lon in rows)
+    print(f"Wrote {len(rows)} rows ({len({r[0] for r in rows})} PLZ) to {OUTPUT_PATH}")
+
+
+if __name__ == "__main__":
+    main()
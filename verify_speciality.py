@@ -1,4 +1,4 @@
-from dashboard import normalize_single_speciality
+from core.read_model import normalize_single_speciality
 
 test_cases = [
     "Kieferorthopädie",